@@ -0,0 +1,109 @@
+import time
+
+import pygame
+
+class Tween:
+    """
+    Moves a surface from where its rectangle is to 'end' (the top left corner) in 'duration' seconds, at a constant speed.
+    The position depends only on the time passed, so a slide takes as long at 30 fps as at 240 fps.
+    """
+
+    def __init__(self, surface, rect, end, duration, start_time):
+        self.surface = surface
+        self.rect = rect
+        self.start = rect.topleft
+        self.end = end
+        self.duration = duration
+        self.start_time = start_time
+
+    def position(self, now):
+        """
+        Returns the position of the top left corner at the time 'now', and true if the end has been reached.
+        """
+        if self.duration <= 0:
+            return self.end, True
+        t = (now - self.start_time) / self.duration
+        if t >= 1:
+            return self.end, True
+        t = max(t, 0)
+        x = round(self.start[0] + (self.end[0] - self.start[0]) * t)
+        y = round(self.start[1] + (self.end[1] - self.start[1]) * t)
+        return (x, y), False
+
+    def rescale(self, factor, now):
+        """
+        Makes the rest of the tween take 'factor' times as long, without a jump in the position.
+        """
+        if self.duration <= 0:
+            return
+        t = min(max((now - self.start_time) / self.duration, 0), 1)
+        self.duration *= factor
+        self.start_time = now - t * self.duration
+
+class Animator:
+    """
+    Runs the tweens of the sprites on the screen. The game loop calls 'update()' once per frame instead of the animation
+    having a loop of its own, so player input is handled while sprites move.
+    A sprite has at most one tween - a new one for the same rectangle replaces the old one, starting from where it got to.
+    """
+
+    def __init__(self, screen, background_color):
+        self.screen = screen
+        self.background_color = background_color
+        self.tweens = []
+
+    @property
+    def busy(self):
+        """True while any tween is running."""
+        return len(self.tweens) > 0
+
+    def slide(self, surface, rect, end, duration, now=None):
+        """
+        Starts moving the surface (drawn at 'rect') to the top left corner 'end' in 'duration' seconds.
+        'rect' is moved by 'update()'.
+        """
+        if now is None:
+            now = time.perf_counter()
+        self.tweens = [tween for tween in self.tweens if tween.rect is not rect]
+        self.tweens.append(Tween(surface, rect, end, duration, now))
+
+    def update(self, now=None):
+        """
+        Moves and redraws the sprites to where they are at the time 'now' (by default the current time) and drops the tweens
+        which are done. Returns the rectangles of the screen which changed.
+        """
+        if not self.tweens:
+            return []
+        if now is None:
+            now = time.perf_counter()
+
+        dirty = []
+        running = []
+        # Erase all moving sprites before drawing any, so sprites next to each other don't erase each other.
+        for tween in self.tweens:
+            pygame.draw.rect(self.screen, rect=tween.rect, color=self.background_color)
+            old_rect = tween.rect.copy()
+            tween.rect.topleft, done = tween.position(now)
+            dirty.append(old_rect.union(tween.rect)) # Only the area the sprite moved through changed.
+            if not done:
+                running.append(tween)
+        for tween in self.tweens:
+            self.screen.blit(tween.surface, tween.rect)
+
+        self.tweens = running
+        return dirty
+
+    def finish(self):
+        """
+        Moves all sprites to the end of their tweens. Returns the rectangles of the screen which changed.
+        """
+        return self.update(float('inf'))
+
+    def rescale(self, factor, now=None):
+        """
+        Makes the rest of every running tween take 'factor' times as long (e.g. 0.5 to go twice as fast).
+        """
+        if now is None:
+            now = time.perf_counter()
+        for tween in self.tweens:
+            tween.rescale(factor, now)
@@ -0,0 +1,167 @@
+import itertools
+import math
+
+import numpy as np
+
+import permutation_rank as pr
+from policy_file import Policy
+from q_learning import QLearning
+from state_sampler import StateSampler
+
+class BatchedQLearning(QLearning):
+    """
+    Same Q-learning algorithm as 'QLearning' but plays 'batch_size' games at once. Every step all running games choose their
+    action, move the hole and update the Q-table together as NumPy operations over the whole batch. A game which is solved or
+    reaches 'max_steps' is replaced with a new shuffled game.
+    """
+
+    def __init__(self, learning_rate, discount_factor, generations, max_steps, exploration_probability, start_distance=None, batch_size=4096, seed=None):
+        super().__init__(learning_rate, discount_factor, generations, max_steps, exploration_probability, start_distance)
+        self.batch_size = batch_size # Number of games played at the same time.
+        self.seed = seed # Seed for the random generator. Training is repeatable for the same seed.
+
+    @staticmethod
+    def _generate_boards():
+        """
+        Returns a (181440, 9) array with the board of every state - the row with index 's' is 'permutation_rank.unrank(s)'.
+        """
+
+        # 'itertools.permutations()' goes through the permutations in lexicographic order, which is the order of their Lehmer
+        # ranks, so the even permutations come out in the order of their index.
+        tiles = np.array(list(itertools.permutations(range(1, 9))), dtype=np.int8)
+        inversions = np.zeros(len(tiles), dtype=np.int8)
+        for i in range(0, 8):
+            for j in range(i + 1, 8):
+                inversions += tiles[:, i] > tiles[:, j]
+        tiles = tiles[inversions % 2 == 0]
+
+        boards = np.empty((pr.STATE_COUNT, 9), dtype=np.int8)
+        for hole in range(0, 9):
+            block = boards[hole * pr.PERMUTATIONS_PER_HOLE:(hole + 1) * pr.PERMUTATIONS_PER_HOLE]
+            block[:, :hole] = tiles[:, :hole]
+            block[:, hole] = 0
+            block[:, hole + 1:] = tiles[:, hole:]
+
+        return boards
+
+    @staticmethod
+    def _rank_boards(boards):
+        """
+        Vectorized 'permutation_rank.rank()'. Takes an (n, 9) array of solvable boards and returns their indexes.
+        """
+        holes = np.argmax(boards == 0, axis=1)
+        tiles = boards[boards != 0].reshape(-1, 8)
+
+        lehmer = np.zeros(len(boards), dtype=np.int64)
+        for i in range(0, 8):
+            digits = np.sum(tiles[:, i + 1:] < tiles[:, i:i + 1], axis=1)
+            lehmer += digits * math.factorial(7 - i)
+
+        return holes * pr.PERMUTATIONS_PER_HOLE + lehmer // 2
+
+    @staticmethod
+    def _generate_transitions(boards):
+        """
+        Returns a (181440, 4) array with the index of the next state for every state and action (u/r/d/l).
+        Impossible actions lead to -1.
+        """
+        holes = np.argmax(boards == 0, axis=1)
+        transitions = np.full((pr.STATE_COUNT, 4), -1, dtype=np.int32)
+        rows = np.arange(pr.STATE_COUNT)
+
+        for a, (offset, possible) in enumerate((
+            (-3, holes >= 3),
+            (1, holes % 3 != 2),
+            (3, holes <= 5),
+            (-1, holes % 3 != 0)
+        )):
+            moved = boards[possible].copy()
+            h = holes[possible]
+            t = h + offset
+            r = rows[: len(moved)]
+            moved[r, h] = moved[r, t]
+            moved[r, t] = 0
+            transitions[possible, a] = BatchedQLearning._rank_boards(moved)
+
+        return transitions
+
+    @staticmethod
+    def _get_vectorized_policy(q_table):
+        """
+        Vectorized 'QLearning._get_policy()'. Returns the state-action map of a (181440, 4) Q-table.
+        """
+        best = np.argmax(q_table, axis=1).astype(np.uint8)
+        best[pr.SOLVED_RANK] = 0 # This is the final state. The puzzle is solved so no more actions are needed.
+
+        # Four 2-bit actions per byte, the first one in the lowest bits.
+        packed = (best.reshape(-1, 4) << np.array([0, 2, 4, 6], dtype=np.uint8)).sum(axis=1, dtype=np.uint8)
+        return Policy(bytearray(packed.tobytes()))
+
+    def _random_states(self, rng, n):
+        """
+        Returns the indexes of 'n' random solvable states, never the solved one. See 'QLearning.start_distance'.
+        """
+        if self.start_distance is not None:
+            bucket = self._start_bucket
+            return bucket[rng.integers(0, len(bucket), size=n)]
+
+        states = rng.integers(0, pr.STATE_COUNT - 1, size=n)
+        return states + (states >= pr.SOLVED_RANK)
+
+    def train(self):
+        rng = np.random.default_rng(self.seed)
+        if self.start_distance is not None:
+            self._start_bucket = np.array(StateSampler().indexes_at(self.start_distance), dtype=np.int64)
+        transitions = self._generate_transitions(self._generate_boards())
+
+        # Row 's' of 'possible_actions' lists the possible actions in state 's', padded with the first one.
+        possible = transitions >= 0
+        possible_count = possible.sum(axis=1)
+        possible_actions = np.argsort(~possible, axis=1, kind='stable').astype(np.int8)
+        q_table = np.frombuffer(self._generate_q_table(), dtype=np.float32).reshape(pr.STATE_COUNT, 4).copy()
+
+        started = min(self.batch_size, self.generations)
+        states = self._random_states(rng, started)
+        steps = np.zeros(started, dtype=np.int32)
+
+        finished = 0
+        while finished < self.generations:
+            # Choose action - explore or exploit.
+            running = len(states)
+            choice = (rng.random(running) * possible_count[states]).astype(np.intp)
+            actions = possible_actions[states, choice].astype(np.intp)
+            if self.exploration_probability < 1:
+                exploit = rng.random(running, dtype=np.float32) >= self.exploration_probability
+                actions[exploit] = np.argmax(q_table[states[exploit]], axis=1)
+
+            # Take action.
+            next_states = transitions[states, actions]
+
+            # Set reward. The final state has no actions (its best value is -inf) so only the reward counts.
+            is_solved = next_states == pr.SOLVED_RANK
+            next_best_action_values = np.where(is_solved, 1.0, self.discount_factor * q_table[next_states].max(axis=1))
+
+            # Update Q-table. If two games update the same state-action pair in one step, the last one wins.
+            q_table[states, actions] = (1 - self.learning_rate) * q_table[states, actions] + self.learning_rate * next_best_action_values
+
+            # Replace finished games (solved or longer than given max) with new ones. When fewer games are left to start than
+            # have finished, the rest of the finished games are dropped and the batch gets smaller.
+            steps += 1
+            done = is_solved | (steps >= self.max_steps)
+            done_count = int(np.count_nonzero(done))
+            replaced = np.flatnonzero(done)[:self.generations - started]
+            started += len(replaced)
+            states = np.where(done, 0, next_states)
+            states[replaced] = self._random_states(rng, len(replaced))
+            steps[replaced] = 0
+            if len(replaced) < done_count:
+                keep = ~done
+                keep[replaced] = True
+                states, steps = states[keep], steps[keep]
+
+            if (finished + done_count) // 10000 > finished // 10000:
+                print(f'{(finished + done_count) // 10000 * 10000} generations completed.')
+            finished += done_count
+
+        self.generations_used = finished
+        self.table = self._get_vectorized_policy(q_table)
@@ -0,0 +1,352 @@
+import argparse
+import json
+import os
+from pathlib import Path
+import platform
+import random
+import statistics
+import sys
+import time
+
+from ida_star import IDAStarSolver
+from pattern_database import load_pattern_databases
+from q_learning import QLearning
+from sliding_puzzle import HOLE_MOVES, PackedSlidingPuzzle, SlidingPuzzleGame
+from solver import Solver
+from state_sampler import StateSampler
+
+FOLDER_PATH = Path(__file__).parent.parent
+BASELINE_PATH = Path(FOLDER_PATH, 'benchmarks', 'baseline.json')
+POLICY_PATHS = {
+    'bin': Path(FOLDER_PATH, 'q_tables', 'state-action_map.bin'),
+    'pkl': Path(FOLDER_PATH, 'q_tables', 'state-action_map.pkl')
+}
+PATTERN_DATABASES_PATH = Path(FOLDER_PATH, 'q_tables', 'pattern_databases')
+
+SEED = 0
+
+def _best_time(function, repeat=5):
+    """
+    Calls 'function' 'repeat' times and returns the shortest time it took in seconds.
+    """
+    best = float('inf')
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _metric(value, unit, higher_is_better):
+    return { 'value': value, 'unit': unit, 'higher_is_better': higher_is_better }
+
+# Directions the hole can be moved in according to its position.
+HOLE_DIRECTIONS = tuple(''.join(moves) for moves in HOLE_MOVES)
+
+def _random_walk(length):
+    """
+    Returns a random starting board and 'length' directions which can be used to move the hole from it one after another.
+    """
+    rng = random.Random(SEED)
+    puzzle = PackedSlidingPuzzle()
+    puzzle.shuffle(rng)
+    start = list(puzzle.board)
+
+    directions = []
+    for _ in range(0, length):
+        direction = rng.choice(HOLE_DIRECTIONS[puzzle.hole])
+        puzzle.move_hole(direction)
+        directions.append(direction)
+    return start, directions
+
+def bench_move_hole(moves=100000):
+    start, directions = _random_walk(moves)
+    results = {}
+    for name, puzzle in (('list', SlidingPuzzleGame()), ('packed', PackedSlidingPuzzle())):
+        def run():
+            puzzle.board = list(start)
+            for direction in directions:
+                puzzle.move_hole(direction)
+        results[f'move_hole.{name}'] = _metric(moves / _best_time(run), 'moves/s', True)
+    return results
+
+def bench_shuffle(shuffles=20000):
+    results = {}
+    for name, puzzle in (('list', SlidingPuzzleGame()), ('packed', PackedSlidingPuzzle())):
+        def run():
+            random.seed(SEED)
+            for _ in range(0, shuffles):
+                puzzle.shuffle()
+        results[f'shuffle.{name}'] = _metric(shuffles / _best_time(run), 'shuffles/s', True)
+    return results
+
+def bench_count_transpositions(calls=50000):
+    rng = random.Random(SEED)
+    boards = []
+    for _ in range(0, 1000):
+        board = [0,1,2,3,4,5,6,7,8]
+        rng.shuffle(board)
+        boards.append(board)
+
+    def run():
+        for i in range(0, calls):
+            SlidingPuzzleGame.count_transpositions(boards[i % 1000])
+    return { 'count_transpositions': _metric(calls / _best_time(run), 'calls/s', True) }
+
+def bench_train(generations=3000):
+    agent = QLearning(learning_rate=1.0, discount_factor=0.92, generations=generations, max_steps=40, exploration_probability=1.0)
+
+    steps = 0
+    def run():
+        nonlocal steps
+        steps = agent._play_games(agent._generate_q_table(), generations, random.Random(SEED), verbose=False)
+    seconds = _best_time(run, repeat=3)
+
+    return {
+        'train.episodes': _metric(generations / seconds, 'episodes/s', True),
+        'train.steps': _metric(steps / seconds, 'steps/s', True)
+    }
+
+def bench_solver_load():
+    results = {}
+    for name, path in POLICY_PATHS.items():
+        if path.exists():
+            results[f'solver_load.{name}'] = _metric(_best_time(lambda: Solver(path)) * 1000, 'ms', False)
+    return results
+
+def bench_solve_path(boards=5000):
+    """
+    Solves random boards with 'Solver.solve_path()' - first with an empty cache, then again with the solutions cached.
+    """
+    boards = StateSampler(random.Random(SEED)).sample_batch(boards)
+    solver = Solver(POLICY_PATHS['bin'])
+
+    def run():
+        for board in boards:
+            solver.solve_path(board)
+
+    cold = _best_time(run, repeat=1)
+    warm = _best_time(run)
+    return {
+        'solve_path.cold': _metric(len(boards) / cold, 'boards/s', True),
+        'solve_path.warm': _metric(len(boards) / warm, 'boards/s', True)
+    }
+
+def _percentile(values, p):
+    """
+    Returns the 'p'-th percentile (nearest rank) of sorted 'values'.
+    """
+    return values[max(0, -(-p * len(values) // 100) - 1)]
+
+def bench_ida_star(boards=100):
+    """
+    Solves random 15-puzzle boards. Skipped if the pattern databases are not built (see 'pattern_database.py').
+    The times of single boards are spread widely - a few hard boards take many times as long as a typical one - so the
+    median, the 95th percentile and the longest time are reported along with the mean.
+    """
+    try:
+        solver = IDAStarSolver(load_pattern_databases(PATTERN_DATABASES_PATH, build=False))
+    except FileNotFoundError:
+        print(f'No pattern databases in {PATTERN_DATABASES_PATH}, skipping.', file=sys.stderr)
+        return {}
+
+    rng = random.Random(SEED)
+    puzzle = SlidingPuzzleGame(4)
+    nodes = 0
+    times = []
+    for _ in range(0, boards):
+        puzzle.shuffle(rng)
+        board = list(puzzle.board)
+        times.append(_best_time(lambda: solver.solve(board), repeat=1))
+        nodes += solver.nodes
+
+    seconds = sum(times)
+    times.sort()
+    return {
+        'ida_star.nodes': _metric(nodes / seconds, 'nodes/s', True),
+        'ida_star.solve': _metric(seconds / boards * 1000, 'ms', False),
+        'ida_star.solve_p50': _metric(_percentile(times, 50) * 1000, 'ms', False),
+        'ida_star.solve_p95': _metric(_percentile(times, 95) * 1000, 'ms', False),
+        'ida_star.solve_max': _metric(times[-1] * 1000, 'ms', False)
+    }
+
+def bench_tile_atlas():
+    """
+    Measures the time to get the scaled puzzle image: building it from the image file, and reading it from the cache.
+    """
+    import tempfile
+    import game_constants as gc
+    from tile_atlas import build_atlas, load_atlas
+
+    side = gc.SCREEN_WIDTH - gc.BORDER_WIDTH * 2
+    build_seconds = _best_time(lambda: build_atlas(gc.PUZZLE_IMG_PATH, side), repeat=3)
+    with tempfile.TemporaryDirectory() as folder:
+        load_atlas(gc.PUZZLE_IMG_PATH, side, folder)
+        load_seconds = _best_time(lambda: load_atlas(gc.PUZZLE_IMG_PATH, side, folder))
+
+    return {
+        'tile_atlas.build': _metric(build_seconds * 1000, 'ms', False),
+        'tile_atlas.load': _metric(load_seconds * 1000, 'ms', False)
+    }
+
+def bench_render(slides=20, frames_per_slide=60):
+    """
+    Measures the time of one frame of the tile slide animation. Runs with SDL's dummy video driver, so no window is opened.
+    The frames are advanced by a fixed step of time instead of waiting for the clock, so the time is the cost of drawing a frame.
+    """
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    from game import Game
+
+    game = Game(start=False)
+    try:
+        game._wait_for_puzzle_pieces()
+        game._position_puzzle_pieces()
+        rng = random.Random(SEED)
+
+        def run():
+            for _ in range(0, slides):
+                # Slide a random tile next to the hole.
+                h_i = game.puzzle.board.index(0)
+                t_i = rng.choice(list(HOLE_MOVES[h_i].values()))
+                game.puzzle.move_tile_by_index(t_i)
+                game._start_tile_slide(t_i, h_i, 1, now=0)
+                for frame in range(1, frames_per_slide + 1):
+                    game._dirty_rects.extend(game.animator.update(frame / frames_per_slide))
+                    game._update_display()
+        seconds = _best_time(run, repeat=3)
+
+        increments = 10000
+        def count():
+            game.move_counter.zero()
+            for _ in range(0, increments):
+                game.move_counter.increment()
+        counter_seconds = _best_time(count, repeat=3)
+    finally:
+        game.close()
+
+    return {
+        'render.slide_frame': _metric(seconds / (slides * frames_per_slide) * 1000, 'ms', False),
+        'render.counter_increment': _metric(counter_seconds / increments * 1e6, 'us', False)
+    }
+
+def bench_simulate():
+    """
+    Plays the default script of 'simulate.py' (solving, moving tiles, shuffling) on a headless game and measures the time the
+    game works on a frame.
+    """
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    from simulate import simulate
+
+    report = simulate(seed=SEED)
+    return { f'simulate.work_{p}': _metric(report['work_time'][p], 'ms', False) for p in ('p50', 'p95', 'p99') }
+
+BENCHMARKS = {
+    'move_hole': bench_move_hole,
+    'shuffle': bench_shuffle,
+    'count_transpositions': bench_count_transpositions,
+    'train': bench_train,
+    'solver_load': bench_solver_load,
+    'solve_path': bench_solve_path,
+    'ida_star': bench_ida_star,
+    'tile_atlas': bench_tile_atlas,
+    'render': bench_render,
+    'simulate': bench_simulate
+}
+
+def run_benchmarks(names, repeats=5):
+    """
+    Runs the benchmarks 'repeats' times - all of them once, then all of them again, so a slow moment of the machine doesn't
+    hit every run of one benchmark. The value of every metric is the median of its runs, and its 'spread' is how far apart
+    the runs were: (largest - smallest) / median.
+    """
+    runs = {}
+    for repeat in range(0, repeats):
+        for name in names:
+            print(f'Running {name} ({repeat + 1}/{repeats})...', file=sys.stderr)
+            for metric_name, metric in BENCHMARKS[name]().items():
+                runs.setdefault(metric_name, []).append(metric)
+
+    metrics = {}
+    for metric_name, metric_runs in runs.items():
+        values = sorted(m['value'] for m in metric_runs)
+        median = statistics.median(values)
+        metrics[metric_name] = dict(metric_runs[0], value=median, spread=(values[-1] - values[0]) / median, runs=len(values))
+
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': SEED,
+        'repeats': repeats,
+        'metrics': metrics
+    }
+
+def compare(results, baseline, tolerance):
+    """
+    Prints the change of every metric against the baseline to stderr. Returns the names of the metrics which got worse by more
+    than 'tolerance' (a fraction, e.g. 0.1 for 10%) plus the noise of the metric - the bigger of its spreads in the results
+    and in the baseline (see 'run_benchmarks()') - so a metric which jumps around from run to run doesn't fail on noise alone.
+    """
+    regressions = []
+    print(f'{"metric":<24} {"baseline":>12} {"current":>12} {"change":>8} {"allowed":>8}', file=sys.stderr)
+    for name, metric in results['metrics'].items():
+        if name not in baseline['metrics']:
+            print(f'{name:<24} {"-":>12} {metric["value"]:>12.4g} {"new":>8}', file=sys.stderr)
+            continue
+
+        old = baseline['metrics'][name]
+        change = metric['value'] / old['value'] - 1
+        worse = -change if metric['higher_is_better'] else change
+        allowed = tolerance + max(metric.get('spread', 0), old.get('spread', 0))
+        status = ' REGRESSION' if worse > allowed else ''
+        if status:
+            regressions.append(name)
+        print(f'{name:<24} {old["value"]:>12.4g} {metric["value"]:>12.4g} {change:>+8.1%} {allowed:>8.0%}{status}', file=sys.stderr)
+
+    return regressions
+
+if __name__ == '__main__':
+    """
+    Runs the benchmarks '--repeats' times and prints the median of every metric as JSON.
+    Compares the results with the baseline in "benchmarks/baseline.json" (if it exists) and exits with an error
+    if a metric got worse by more than the tolerance plus its run-to-run spread.
+    The baseline is saved by one run with '--save-baseline' on the machine the benchmarks are compared on.
+    Example:
+        python benchmark.py --only move_hole,train --output results.json
+    """
+
+    parser = argparse.ArgumentParser(description='Benchmark the puzzle, the training, the solver and the rendering.')
+    parser.add_argument('--only', help=f'comma separated benchmarks to run: {",".join(BENCHMARKS)}')
+    parser.add_argument('--output', help='write the results to this JSON file instead of printing them')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline to compare with')
+    parser.add_argument('--repeats', type=int, default=5, help='runs of every benchmark, the median is reported (default 5)')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed fraction a metric may get worse by on top of its run-to-run spread (default 0.1)')
+    parser.add_argument('--save-baseline', action='store_true', help='save the results as the new baseline')
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            parser.error(f'Unknown benchmark {name}.')
+
+    if args.repeats < 1:
+        parser.error('--repeats must be at least 1.')
+
+    results = run_benchmarks(names, args.repeats)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        Path(args.baseline).parent.mkdir(exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+    elif Path(args.baseline).exists():
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
@@ -2,6 +2,7 @@ import math
 import pygame
 
 import game_constants as gc
+import text_cache
 
 class Button:
     def __init__(self, screen, width, height, text, font, center=None, bottom_left=None, bottom_right=None):
@@ -9,6 +10,7 @@ class Button:
         self.btn = pygame.Rect((0, 0), (width, height))
         self.text = text
         self.font = font
+        self.label = text_cache.render(font, text, gc.TEXT_BUTTON_COLOR) # Rendered once, drawn on every 'draw()'.
 
         if center is not None:
             self.btn.center = center
@@ -26,14 +28,16 @@ class Button:
         return math.sqrt(x * x + y * y)
     
     def draw(self):
+        """Draws the button. Returns its rectangle."""
         pygame.draw.rect(self.screen, rect=self.btn, color=gc.BUTTON_COLOR, border_radius=max(self.btn.width, self.btn.height))
 
-        t = self.font.render(self.text, True, gc.TEXT_BUTTON_COLOR)
-        self.screen.blit(t, t.get_rect(center=self.btn.center))
+        self.screen.blit(self.label, self.label.get_rect(center=self.btn.center))
+        return self.btn
 
     def erase(self, color):
-        """Fills the button with the given color."""
+        """Fills the button with the given color. Returns its rectangle."""
         pygame.draw.rect(self.screen, rect=self.btn, color=color, border_radius=max(self.btn.width, self.btn.height))
+        return self.btn
 
     def check_btn_press(self, point):
         """
@@ -0,0 +1,22 @@
+import argparse
+import pickle
+
+from policy_file import write_policy
+
+if __name__ == '__main__':
+    """
+    Converts a pickled state-action map (the '.pkl' files saved by 'QLearning.save()') to the compact binary format
+    read by 'Solver' (see 'policy_file.py').
+    Example:
+        python convert_policy.py "../q_tables/state-action_map.pkl" "../q_tables/state-action_map.bin"
+    """
+
+    parser = argparse.ArgumentParser(description='Convert a pickled state-action map to the binary format.')
+    parser.add_argument('source', help='pickled state-action map')
+    parser.add_argument('destination', help='binary state-action map to create')
+    args = parser.parse_args()
+
+    with open(args.source, 'rb') as f:
+        table = pickle.load(f)
+
+    write_policy(args.destination, table)
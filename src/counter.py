@@ -1,40 +1,44 @@
 import pygame
 
 import game_constants as gc
+import text_cache
 
 class Counter:
 
     def __init__(self, screen, center):
         self.screen = screen
         self.center = center # (x, y)
-        self.font = pygame.font.Font(None, gc.COUNTER_FONT_SIZE)
+        self.font = text_cache.get_font(gc.COUNTER_FONT_SIZE)
         self.n = 0
 
     def erase(self):
-        text = self.font.render(str(self.n), True, gc.COUNTER_FONT_COLOR)
-        rect = text.get_rect(center=self.center)
-
+        """
+        Returns the rectangle of the erased number.
+        """
+        rect = text_cache.number_rect(self.font, self.n, gc.COUNTER_FONT_COLOR, self.center)
         pygame.draw.rect(self.screen, rect=rect, color=gc.BACKGROUND_COLOR)
+        return rect
 
     def draw(self):
-        text = self.font.render(str(self.n), True, gc.COUNTER_FONT_COLOR)
-        rect = text.get_rect(center=self.center)
-        self.screen.blit(text, rect)
+        """
+        Returns the rectangle of the drawn number.
+        """
+        return text_cache.draw_number(self.screen, self.font, self.n, gc.COUNTER_FONT_COLOR, self.center)
 
     def increment(self):
         """
         Increments the counter.
-        Draws the number on the screen.
+        Draws the number on the screen. Returns the rectangle of the screen which changed.
         """
-        self.erase()
+        erased = self.erase()
         self.n += 1
-        self.draw()
+        return erased.union(self.draw())
         
     def zero(self):
         """
         Zero out the counter.
-        Draw 0 on screen
+        Draw 0 on screen. Returns the rectangle of the screen which changed.
         """
-        self.erase()
+        erased = self.erase()
         self.n = 0
-        self.draw()
\ No newline at end of file
+        return erased.union(self.draw())
\ No newline at end of file
@@ -0,0 +1,61 @@
+import random
+
+from q_learning import QLearning
+from state_sampler import StateSampler
+
+class ReverseCurriculum:
+    """
+    Chooses the start of every game of 'QLearning' - first a few moves away from the solved state, then further and further
+    (reverse curriculum).
+
+    Games which start from a uniformly random board rarely reach the solved state early in the training, so they teach
+    nothing. With the curriculum the games start from random boards which take exactly 'distance' moves to solve (see
+    'StateSampler'), beginning with 'start_distance'. After every game the greedy policy of the Q-table is followed from the
+    start of the game; if it solves the board in 'distance' moves (the fewest possible), the game counts as a success.
+    Every 'window' games at the same distance the success rate is checked, and if it is at least 'threshold', the distance
+    grows by one.
+    After the farthest boards (31 moves) the games start from uniformly random boards.
+    """
+
+    def __init__(self, start_distance=1, threshold=0.95, window=1000, rng=random):
+        self.start_distance = start_distance
+        self.threshold = threshold # Must be 0 < threshold <= 1.
+        self.window = window # Games at a distance between two checks of the success rate.
+        self.sampler = StateSampler(rng)
+
+        self.start()
+
+    def start(self):
+        """
+        Starts the curriculum from the beginning. Called by 'QLearning' before the first game.
+        """
+        self.distance = self.start_distance # None - uniformly random boards.
+        self.history = [(0, self.distance)] # (generation, distance) whenever the distance changed.
+        self._games = 0
+        self._successes = 0
+
+    def sample_index(self):
+        """
+        Returns the index of the start of the next game.
+        """
+        return self.sampler.sample_index(self.distance)
+
+    def game_finished(self, generation, start, q_table):
+        """
+        Checks whether the greedy policy of 'q_table' solves the start of the finished game and grows the distance when
+        enough games at this distance were successes.
+        """
+        if self.distance is None:
+            return
+
+        self._games += 1
+        # A success if the policy solves the board in the fewest possible moves.
+        self._successes += QLearning._greedy_moves(q_table, start, self.distance) is not None
+        if self._games < self.window:
+            return
+
+        if self._successes >= self.threshold * self._games:
+            self.distance = self.distance + 1 if self.distance < self.sampler.max_distance else None
+            self.history.append((generation, self.distance))
+        self._games = 0
+        self._successes = 0
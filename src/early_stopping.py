@@ -0,0 +1,102 @@
+import random
+
+import permutation_rank as pr
+from policy_evaluation import evaluate_policy
+from q_learning import QLearning
+
+class EarlyStopping:
+    """
+    Stops 'QLearning.train()' when more games would not change the resulting state-action map much, instead of always
+    playing all the generations.
+
+    Every 'interval' games the greedy policy of the Q-table is checked on a fixed random sample of 'sample_size' states:
+    churn - the fraction of the sampled states whose best action changed since the last check.
+    sampled evaluation - how many sampled states the policy solves in at most 'max_moves' moves and how many moves it takes.
+
+    The training stops as soon as one of the given criteria is met (None turns a criterion off):
+    'churn' - the churn is at most this fraction and the policy solves every sampled state.
+    'patience' - the sampled evaluation did not get better (more states solved, or the same number in fewer moves) in this
+        many checks in a row. The checks before the policy solves any sampled state don't count.
+    'target_moves' - the policy solves every state in at most this many moves (31 is optimal). It is checked on all states
+        with 'evaluate_policy()' (a few seconds), but only when the policy solves every sampled state in at most this many.
+
+    After the training 'reason' is why it stopped ('churn', 'patience', 'target_moves' or None if all the generations were
+    played), 'generation' is the number of games played, and 'history' holds the result of every check.
+    """
+
+    def __init__(self, interval=10000, churn=None, patience=None, target_moves=None, sample_size=5000, max_moves=50, seed=0):
+        self.interval = interval
+        self.churn = churn
+        self.patience = patience
+        self.target_moves = target_moves
+        self.sample_size = sample_size
+        self.max_moves = max_moves # Longer solutions count as not solved.
+        self.seed = seed # Seed of the sample, so the same states are checked in every training.
+
+        self.reason = None
+        self.generation = None
+        self.history = []
+
+    def start(self, q_table):
+        """
+        Draws the sample and remembers the policy. Called by 'QLearning' before the first game.
+        """
+        rng = random.Random(self.seed)
+        states = [s for s in range(0, pr.STATE_COUNT) if s != pr.SOLVED_RANK]
+        self._sample = rng.sample(states, min(self.sample_size, len(states)))
+        self._best_actions = self._get_best_actions(q_table)
+        self._best_score = None
+        self._checks_without_improvement = 0
+
+        self.reason = None
+        self.generation = None
+        self.history = []
+
+    def _get_best_actions(self, q_table):
+        return [QLearning._find_best_action(q_table, state)[0] for state in self._sample]
+
+    def check(self, generation, q_table):
+        """
+        Checks the criteria after 'generation' games. Returns True if the training should stop.
+        """
+        best_actions = self._get_best_actions(q_table)
+        churn = sum(1 for old, new in zip(self._best_actions, best_actions) if old != new) / len(self._sample)
+        self._best_actions = best_actions
+
+        solved, total_moves, most_moves = 0, 0, 0
+        for state in self._sample:
+            moves = QLearning._greedy_moves(q_table, state, self.max_moves)
+            if moves is not None:
+                solved += 1
+                total_moves += moves
+                most_moves = max(most_moves, moves)
+        all_solved = solved == len(self._sample)
+
+        score = (solved, -total_moves)
+        if solved > 0 and (self._best_score is None or score > self._best_score):
+            self._best_score = score
+            self._checks_without_improvement = 0
+        elif self._best_score is not None:
+            self._checks_without_improvement += 1
+
+        self.history.append({
+            'generation': generation,
+            'churn': churn,
+            'solved_fraction': solved / len(self._sample),
+            'mean_moves': total_moves / solved if solved else None,
+            'most_moves': most_moves if solved else None
+        })
+
+        if self.churn is not None and all_solved and churn <= self.churn:
+            self.reason = 'churn'
+        elif self.patience is not None and self._checks_without_improvement >= self.patience:
+            self.reason = 'patience'
+        elif self.target_moves is not None and all_solved and most_moves <= self.target_moves:
+            evaluation = evaluate_policy(QLearning._get_policy(q_table))
+            if not evaluation.looping and evaluation.most_moves <= self.target_moves:
+                self.reason = 'target_moves'
+
+        if self.reason is not None:
+            self.generation = generation
+            return True
+        return False
@@ -1,80 +1,161 @@
-import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import pygame
 import sys
+import threading
 
+from animation import Animator
 from button import Button
 from counter import Counter
 import game_constants as gc
 from sliding_puzzle import SlidingPuzzleGame
-from solver import Solver
 from start_menu import StartMenu
+import text_cache
+from tile import Tile
+from tile_atlas import load_atlas
 
 class Game:
 
-    def __init__(self):
-        self.puzzle = SlidingPuzzleGame() # Contains the puzzle logic.
-        self.solver = Solver(gc.STATE_ACTION_MAP_PATH)
-        self.tile_size, self.tiles = self._load_puzzle_pieces()
+    def __init__(self, start=True, size=3):
+        """
+        Sets up the window and runs the game until the player quits.
+        If 'start' is false, only sets up the window - the caller drives the game and calls 'close()' when done.
+        'size' is the number of rows and columns - 3 for the 8-puzzle, 4 for the 15-puzzle.
+        """
+        self.size = size
+        self.puzzle = SlidingPuzzleGame(size) # Contains the puzzle logic.
 
         pygame.init()  
-        pygame.display.set_caption('8-puzzle')
+        pygame.display.set_caption(f'{size * size - 1}-puzzle')
         self.screen = pygame.display.set_mode(size=(gc.SCREEN_WIDTH, gc.SCREEN_HEIGHT))
-        self.move_counter = Counter(self.screen, (gc.SCREEN_WIDTH // 2, gc.BORDER_WIDTH * 4 + self.tile_size * 3))
+        pygame.event.set_blocked(pygame.MOUSEMOTION) # Not used, and it would wake up the idle loop on every move of the mouse.
+
+        # The solver and the puzzle pieces are loaded in the background while the start menu is shown.
+        # '_play()' and '_solve()' wait for them only if they are not loaded yet.
+        self._loader = ThreadPoolExecutor(max_workers=1)
+        self._pieces_future = self._loader.submit(self._load_puzzle_pieces, size)
+        self._solver_future = self._loader.submit(self._load_solver, size)
+        self._sampler_future = self._loader.submit(self._load_sampler)
+        self.tiles = None # The 'Tile' of every number: 'self.tiles[n]' shows 'n', the tile in board cell 'i' is 'self.tiles[board[i]]'.
+        # Parts of the screen which changed since the display was last updated. Only these are sent to the display.
+        self._dirty_rects = []
+        self.animator = Animator(self.screen, gc.BACKGROUND_COLOR) # Moves the sliding tiles, one step per frame.
+
+        # State of the solver while it plays its solution (see '_start_solving()').
+        self._solve_future = None # The solution being found in the background, None when the solver is not running.
+        self._solve_cancelled = None # Set to stop the search of '_solve_future' (see '_cancel_solving()').
+        self._solution = None # Moves of the solution which are not played yet.
+        self._stop_requested = False
+        self.solver_speed = 1 # The solver slides tiles this many times as fast as 'gc.SLIDE_DURATION_SOLVER'.
+        self._message_rect = None # Where a message is shown over the board (see '_draw_message()'), None if there is none.
+
+        self.tile_size = (gc.SCREEN_WIDTH - gc.BORDER_WIDTH * 2) // size # Same as the size '_load_puzzle_pieces()' returns.
+        self.move_counter = Counter(self.screen, (gc.SCREEN_WIDTH // 2, gc.BORDER_WIDTH * 4 + self.tile_size * size))
+
+        if start:
+            self._start_game()
+            self.close()
+
+    def close(self):
+        self._cancel_solving()
+        self._loader.shutdown(cancel_futures=True) # Let a running load finish before pygame is shut down.
+        pygame.quit()
+        text_cache.clear()
 
-        self._start_game()
+    @property
+    def solver(self):
+        """
+        The solver. Waits for it to load if it is not loaded yet.
+        """
+        return self._solver_future.result()
 
-        pygame.quit()
+    @property
+    def sampler(self):
+        """
+        The random board sampler. Waits for it to load if it is not loaded yet.
+        """
+        return self._sampler_future.result()
+
+    @staticmethod
+    def _load_solver(size):
+        # The solvers are imported here, in the background thread, so the window opens without waiting for them.
+        if size == 3:
+            from solver import Solver
+            return Solver(gc.STATE_ACTION_MAP_PATH)
+
+        from ida_star import IDAStarSolver
+        try:
+            # Never built here - that takes about ten minutes and 1 GB of memory, with no sign of it in the window.
+            return IDAStarSolver.load(gc.PATTERN_DATABASES_PATH, build=False)
+        except FileNotFoundError as e:
+            raise FileNotFoundError('The 15-puzzle needs pattern databases. Build them with pattern_database.py, which takes about ten minutes.') from e
 
     @staticmethod
-    def _load_puzzle_pieces():
+    def _load_sampler():
+        from state_sampler import StateSampler
+        sampler = StateSampler()
+        if gc.SHUFFLE_DISTANCE is not None:
+            sampler.indexes_at(gc.SHUFFLE_DISTANCE) # Finds the distances of all boards, which takes a few seconds.
+        return sampler
+
+    def _update_display(self):
+        """
+        Updates the parts of the display which changed (see '_dirty_rects').
+        Use 'pygame.display.flip()' instead when the whole screen is redrawn.
+        """
+        if self._dirty_rects:
+            pygame.display.update(self._dirty_rects)
+            self._dirty_rects.clear()
+
+    def _wait_for_puzzle_pieces(self):
+        """
+        Waits for the puzzle pieces to load if they are not loaded yet.
         """
-        Reads an image, resizes it so that it fits in the width of the screen, slices it, and returns
-        the 9 puzzle pieces with aditional info to operate with them.
+        if self.tiles is None:
+            self.tile_size, self.tiles = self._pieces_future.result()
+
+    @staticmethod
+    def _load_puzzle_pieces(size):
+        """
+        Reads an image, resizes it so that it fits in the width of the screen (see 'tile_atlas.py'), slices it, and returns
+        the 'size' * 'size' puzzle pieces as 'Tile's, indexed by their number.
         Returns the side length of the pieces.
         Requires the input image to be square.
         """
 
-        img = pygame.image.load(gc.PUZZLE_IMG_PATH)
-        assert img.get_width() == img.get_height(), "Puzzle image must be square."
-
         img_size = gc.SCREEN_WIDTH - gc.BORDER_WIDTH * 2
-        resized_img = pygame.transform.smoothscale(img, (img_size, img_size))
+        resized_img = load_atlas(gc.PUZZLE_IMG_PATH, img_size, gc.TILE_ATLAS_CACHE_PATH) # Read from the cache after the first start.
 
-        tile_size = img_size // 3
+        tile_size = img_size // size
 
         # Slice the image.
-        tiles = []
-        for row in range(0, 3):
-            for col in range(0, 3):
+        tiles = [None] * (size * size)
+        for row in range(0, size):
+            for col in range(0, size):
+                number = (row * size + col + 1) % (size * size) # Bottom right tile is the empty spot, 0.
                 rect = pygame.Rect((col * tile_size, row * tile_size), (tile_size, tile_size))
-                tiles.append({
-                    'number': row * 3 + col + 1, 
-                    'tile': resized_img.subsurface(rect),
-                    'rect': rect # Give the tile a corresponding rectangle. 
-                })
-
-        tiles[8]['number'] = 0 # Bottom right tile is the empty spot.
+                tiles[number] = Tile(number, resized_img.subsurface(rect), rect) # Give the tile a corresponding rectangle.
 
         return tile_size, tiles
 
     def _position_puzzle_pieces(self):
         """
-        Positions the puzzle pieces in a grid in the order they appear in 'self.tiles'.
+        Positions the puzzle pieces in a grid in the order of the puzzle board.
         """
 
         # In Pygame it is easiest to associate an image (surface) with a rectangle and let the rectangle handle the moving logic.
         # When we display a tile on the screen we will be using the position of its corresponding rectangle.
-        for i in range(0, 9):
-            row = i // 3
-            col = i % 3
+        for i, number in enumerate(self.puzzle.board):
+            row = i // self.size
+            col = i % self.size
 
             x = gc.BORDER_WIDTH + col * self.tile_size # Horizontal offset from top left corner.
             y = gc.BORDER_WIDTH + row * self.tile_size # Vertical offset form top left corner.
 
-            self.tiles[i]['rect'].topleft = (x, y)
+            self.tiles[number].rect.topleft = (x, y)
 
     def _create_playscreen_buttons(self):
-        font = pygame.font.Font(None, gc.PLAY_BTNS_FONT_SIZE)
+        font = text_cache.get_font(gc.PLAY_BTNS_FONT_SIZE)
 
         back = Button(
             screen=self.screen,
@@ -90,7 +171,7 @@ class Game:
             width=gc.PLAY_BTNS_WIDTH,
             height=gc.PLAY_BTNS_HEIGHT,
             text='Shuffle',
-            font=pygame.font.Font(None, gc.PLAY_BTNS_FONT_SIZE),
+            font=font,
             bottom_right=(gc.SCREEN_WIDTH - gc.BORDER_WIDTH, gc.SCREEN_HEIGHT - gc.BORDER_WIDTH)
         )
 
@@ -99,128 +180,180 @@ class Game:
             width=gc.PLAY_BTNS_WIDTH,
             height=gc.PLAY_BTNS_HEIGHT,
             text='Solve',
-            font=pygame.font.Font(None, gc.PLAY_BTNS_FONT_SIZE),
+            font=font,
+            bottom_right=(gc.SCREEN_WIDTH - gc.BORDER_WIDTH, gc.SCREEN_HEIGHT - gc.BORDER_WIDTH)
+        )
+
+        stop = Button(
+            screen=self.screen,
+            width=gc.PLAY_BTNS_WIDTH,
+            height=gc.PLAY_BTNS_HEIGHT,
+            text='Stop',
+            font=font,
             bottom_right=(gc.SCREEN_WIDTH - gc.BORDER_WIDTH, gc.SCREEN_HEIGHT - gc.BORDER_WIDTH)
         )
 
-        return back, shuffle, solve
+        return back, shuffle, solve, stop
 
     def _draw_tiles(self):
         """
         Draw the tiles one by one.
         """
         clock = pygame.time.Clock()
-        for tile in filter(lambda x: x['number'] != 0, self.tiles):
-            self.screen.blit(tile['tile'], tile['rect'])
-            pygame.display.flip()
+        for number in self.puzzle.board:
+            if number == 0:
+                continue
+            tile = self.tiles[number]
+            self.screen.blit(tile.image, tile.rect)
+            self._dirty_rects.append(tile.rect.copy())
+            self._update_display()
 
             clock.tick(gc.TILE_DRAW_DELAY)
 
     def _shuffle(self):
-        self.puzzle.shuffle()
-
-        new_tile_arrangement = []
-        for num in self.puzzle.board:
-            for tile in self.tiles:
-                if tile['number'] == num:
-                    new_tile_arrangement.append(tile)
-                    break
-        
-        self.tiles = new_tile_arrangement
+        if gc.SHUFFLE_DISTANCE is None or self.size != 3:
+            self.puzzle.shuffle()
+        else:
+            self.puzzle.board = self.sampler.sample(gc.SHUFFLE_DISTANCE)
+
         self._position_puzzle_pieces()
 
-    def _animate_tile_slide(self, tile_index, hole_index, slide_duration_seconds):
-        """
-        Animates the sliding of the tile to the empty spot.
-        Expects valid input.
-        'tile_index' - index of the tile in the list before the slide.
-        'hole_index' - index of the hole in the list before the slide.
-        """
+    def _start_tile_slide(self, tile_index, hole_index, slide_duration_seconds, now=None):
         """
-        Note: The way we animate the sliding of tiles is alright for this game but I think it can be done better. At the moment the
-        '_play()' function has its own "game loop" which doesn't handle events (player input). This is not very nice because the
-        game may seem unresponsive when given commands during the animation.
+        Starts the slide of the tile to the empty spot. The tile is moved by 'self.animator', which '_play()' advances once
+        per frame, so this returns right away.
+        Expects valid input, after the move is made on 'self.puzzle'.
+        'tile_index' - index of the tile on the board before the slide (where the hole is now).
+        'hole_index' - index of the hole on the board before the slide (where the tile is now).
         """
+        tile = self.tiles[self.puzzle.board[hole_index]]
+        hole = self.tiles[0]
+        end = hole.rect.topleft
 
-        # Find direction of the slide.
-        if hole_index == tile_index - 3:
-            direction = 'u'
-        elif hole_index == tile_index + 1:
-            direction = 'r'
-        elif hole_index == tile_index + 3:
-            direction = 'd'
-        elif hole_index == tile_index - 1:
-            direction = 'l'
-
-        # Save this for the final shift.
-        tile_center_before_shift = self.tiles[tile_index]['rect'].center
-        tile_center_after_shift = self.tiles[hole_index]['rect'].center
-
-        self.tiles[hole_index]['rect'].center = tile_center_before_shift # Hole is invisible so move it right away.
-
-        frames = math.ceil(gc.FPS * slide_duration_seconds) # Number of animation frames.
-        dx = self.tile_size / frames # Distance moved per frame.
-
-        rect = self.tiles[tile_index]['rect']
-        tile = self.tiles[tile_index]['tile']
-
-        # Animate slide.
-        clock = pygame.time.Clock()
-        offset = 0
-        for _ in range(frames - 1):
-            pygame.draw.rect(self.screen, rect=rect, color=gc.BACKGROUND_COLOR) # Erase the tile.
-
-            # Move the rectangle.
-            offset += dx
-            if direction == 'u':
-                rect.center = (tile_center_before_shift[0], tile_center_before_shift[1] - offset)
-            elif direction == 'r':
-                rect.center = (tile_center_before_shift[0] + offset, tile_center_before_shift[1])
-            elif direction == 'd':
-                rect.center = (tile_center_before_shift[0], tile_center_before_shift[1] + offset)
-            elif direction == 'l':
-                rect.center = (tile_center_before_shift[0] - offset, tile_center_before_shift[1])
-            
-            self.screen.blit(tile, rect)
-            pygame.display.flip()
-
-            clock.tick(gc.FPS)
-
-        # Set the final position exactly.
-        pygame.draw.rect(self.screen, rect=rect, color=gc.BACKGROUND_COLOR)
-        rect.center = tile_center_after_shift
-        self.screen.blit(tile, rect)
-        pygame.display.flip()
-
-        # Swap tile and hole positions in the list.
-        self.tiles[tile_index], self.tiles[hole_index] = self.tiles[hole_index], self.tiles[tile_index]
+        hole.rect.topleft = tile.rect.topleft # Hole is invisible so move it right away.
+        self.animator.slide(tile.image, tile.rect, end, slide_duration_seconds, now)
 
     def _is_point_on_tile(self, point):
         """
-        If the point is on a tile, returns its index in the list.
+        If the point is on a tile, returns its index on the board.
         Returns None otherwise (including when the point is on the hole).
+        Expects no tile to be sliding - the tiles are where the board says.
         """
+        x = point[0] - gc.BORDER_WIDTH
+        y = point[1] - gc.BORDER_WIDTH
+        if x < 0 or y < 0:
+            return None
 
-        for i in range(0,9):
-            if self.tiles[i]['rect'].collidepoint(point) and self.tiles[i]['number'] != 0:
-                return i
-        
-        return None
+        col = x // self.tile_size
+        row = y // self.tile_size
+        if col >= self.size or row >= self.size:
+            return None
 
-    def _solve(self, solve, back):
-        solve.erase(gc.BACKGROUND_COLOR)
-        back.erase(gc.BACKGROUND_COLOR)
+        i = row * self.size + col
+        return i if self.puzzle.board[i] != 0 else None
 
-        while not self.puzzle.is_solved():
-            tile_index, hole_index = self.puzzle.move_hole(self.solver.get_action(self.puzzle))
-            self.move_counter.increment() 
-            self._animate_tile_slide(tile_index, hole_index, gc.SLIDE_DURATION_SOLVER)
+    def _start_solving(self, solve, back, stop):
+        """
+        Starts finding the solution in the background. '_advance_solver()' plays it once it is found.
+        """
+        self._dirty_rects.append(solve.erase(gc.BACKGROUND_COLOR))
+        self._dirty_rects.append(back.erase(gc.BACKGROUND_COLOR))
+        self._dirty_rects.append(stop.draw())
+
+        board = list(self.puzzle.board)
+        cancelled = threading.Event()
+        self._solution = None
+        self._stop_requested = False
+        self._solve_cancelled = cancelled
+        self._solve_future = self._loader.submit(lambda: self.solver.solve_path(board, cancelled))
+
+    def _cancel_solving(self):
+        """
+        Stops finding the solution in the background. A search which is running stops within a few hundredths of a second
+        (see 'ida_star.CANCEL_CHECK_NODES'), so neither the game nor quitting waits for it.
+        """
+        if self._solve_future is not None:
+            self._solve_future.cancel() # Only works if the search has not started yet.
+            self._solve_cancelled.set()
 
-            # Allow the closing of the window during the solving process.
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+    def _advance_solver(self):
+        """
+        Starts sliding the next tile of the solution once the last slide is done.
+        Returns true when the solver is done - the puzzle is solved or the solver was stopped.
+        """
+        if self._stop_requested:
+            self._cancel_solving() # The result of the search is not used.
+            return True
+        if self.animator.busy or not self._solve_future.done():
+            return False
+
+        if self._solution is None:
+            try:
+                self._solution = deque(self._solve_future.result())
+            except (OSError, ValueError) as e:
+                # The solvers raise these for a file which can't be read or is damaged, and for a state-action map which
+                # goes around in a cycle or has no usable move for a board (see 'Solver._load()' and 'Solver.solve_path()').
+                self._draw_message(f'The solver failed. {e}')
+                return True
+        if not self._solution:
+            return True
+
+        tile_index, hole_index = self.puzzle.move_hole(self._solution.popleft())
+        self._dirty_rects.append(self.move_counter.increment())
+        self._start_tile_slide(tile_index, hole_index, gc.SLIDE_DURATION_SOLVER / self.solver_speed)
+        return False
+
+    def _draw_message(self, text):
+        """
+        Shows 'text' in a box over the board until the next click (see '_erase_message()').
+        """
+        font = text_cache.get_font(gc.MESSAGE_FONT_SIZE)
+        board_side = self.tile_size * self.size
+        width = board_side - gc.BORDER_WIDTH * 2
+
+        # Break the text into lines which fit in the box.
+        lines = []
+        for word in text.split():
+            if lines and font.size(f'{lines[-1]} {word}')[0] <= width - gc.BORDER_WIDTH * 2:
+                lines[-1] = f'{lines[-1]} {word}'
+            else:
+                lines.append(word)
+
+        line_height = font.get_linesize()
+        rect = pygame.Rect(0, 0, width, line_height * len(lines) + gc.BORDER_WIDTH * 2)
+        rect.center = (gc.BORDER_WIDTH + board_side // 2, gc.BORDER_WIDTH + board_side // 2)
+        self.screen.fill(gc.BACKGROUND_COLOR, rect)
+        pygame.draw.rect(self.screen, gc.BUTTON_COLOR, rect, width=2)
+        self.screen.set_clip(rect.inflate(-4, -4)) # A word longer than a line is cut off.
+        for i, line in enumerate(lines):
+            surface = font.render(line, True, gc.COUNTER_FONT_COLOR)
+            self.screen.blit(surface, surface.get_rect(midtop=(rect.centerx, rect.y + gc.BORDER_WIDTH + i * line_height)))
+        self.screen.set_clip(None)
+
+        self._message_rect = rect
+        self._dirty_rects.append(rect.copy())
+
+    def _erase_message(self):
+        """
+        Removes the message of '_draw_message()' and draws the tiles under it again.
+        """
+        rect = self._message_rect
+        self.screen.fill(gc.BACKGROUND_COLOR, rect)
+        for number in self.puzzle.board:
+            tile = self.tiles[number]
+            if number != 0 and tile.rect.colliderect(rect):
+                self.screen.blit(tile.image, tile.rect)
+        self._dirty_rects.append(rect)
+        self._message_rect = None
+
+    def _change_solver_speed(self, factor):
+        """
+        Multiplies the speed of the solver by 'factor', within 'gc.SOLVER_SPEED_LIMITS'. The slide in progress changes too.
+        """
+        low, high = gc.SOLVER_SPEED_LIMITS
+        speed = min(max(self.solver_speed * factor, low), high)
+        self.animator.rescale(self.solver_speed / speed)
+        self.solver_speed = speed
 
     def _move_tile(self, tile_index):
         """
@@ -230,47 +363,92 @@ class Game:
         """
         hole_index = self.puzzle.move_tile_by_index(tile_index)
         if hole_index is not None:
-            self.move_counter.increment()
-            self._animate_tile_slide(tile_index, hole_index, gc.SLIDE_DURATION_PLAYER)
+            self._dirty_rects.append(self.move_counter.increment())
+            self._start_tile_slide(tile_index, hole_index, gc.SLIDE_DURATION_PLAYER)
 
     def _draw_shuffled_screen(self, back_btn, solve_btn):
         """Draws the screen after a new tile shuffle."""
         self._shuffle()
         self.screen.fill(gc.BACKGROUND_COLOR)
+        self._message_rect = None
         back_btn.draw()
-        self._draw_tiles()
         self.move_counter.zero()
-        solve_btn.draw()
-        pygame.display.flip()
+        pygame.display.flip() # The whole screen is redrawn.
+        self._dirty_rects.clear()
+
+        self._draw_tiles()
+        self._dirty_rects.append(solve_btn.draw())
+        self._update_display()
 
     def _draw_solved_screen(self, shuffle_btn):
-        self.screen.blit(self.tiles[8]['tile'], self.tiles[8]['rect']) # Draw the invisible tile (hole) when solved.
-        shuffle_btn.draw()
-        pygame.display.flip()
+        hole = self.tiles[0]
+        self.screen.blit(hole.image, hole.rect) # Draw the invisible tile (hole) when solved.
+        self._dirty_rects.append(hole.rect.copy())
+        self._dirty_rects.append(shuffle_btn.draw())
+        self._update_display()
 
     def _play(self):
         """
         The play window.
+        Every frame handles the input, advances the solver and moves the sliding tiles by the time passed since the last frame.
+        Frames come 'gc.FPS' times a second only while something moves - otherwise the loop sleeps until there is input.
+        Clicks made while a tile slides are queued and handled once it stops. While the solver runs, the 'Stop' button and the
+        keys (Escape stops, up/down speeds it up/slows it down) are handled in the next frame.
         """
 
-        back, shuffle, solve = self._create_playscreen_buttons()
+        back, shuffle, solve, stop = self._create_playscreen_buttons()
 
+        self._wait_for_puzzle_pieces()
         self._draw_shuffled_screen(back, solve)
 
         # Keep track of mousedown events (a button is considered pressed on click and release).
-        is_tile_pressed = [False for _ in range(9)]
+        is_tile_pressed = [False for _ in range(self.size * self.size)]
         is_back_pressed = False
         is_solve_pressed = False
         is_shuffle_pressed = False
+        is_stop_pressed = False
         is_solved = False
+        show_solved_screen = False # Set when the puzzle gets solved. The screen changes once the last tile stops.
+
+        queued_clicks = deque() # Mouse events which wait for the sliding tile to stop.
 
         pygame.event.clear() # Acceps player input after done drawing.
         clock = pygame.time.Clock()
         while True:
-            clock.tick(gc.FPS)
+            idle = not self.animator.busy and self._solve_future is None and not queued_clicks and not show_solved_screen
+
+            for event in self._next_frame(clock, idle):
+
+                if event.type == pygame.QUIT:
+                    self._cancel_solving() # The process waits for the background thread before it exits.
+                    pygame.quit()
+                    sys.exit()
+
+                elif self._solve_future is not None:
+                    # The solver is running.
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        is_stop_pressed = stop.check_btn_press(event.pos)
+                    elif event.type == pygame.MOUSEBUTTONUP:
+                        if is_stop_pressed and stop.check_btn_press(event.pos):
+                            self._stop_requested = True
+                        is_stop_pressed = False
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            self._stop_requested = True
+                        elif event.key in (pygame.K_UP, pygame.K_PLUS, pygame.K_KP_PLUS):
+                            self._change_solver_speed(2)
+                        elif event.key in (pygame.K_DOWN, pygame.K_MINUS, pygame.K_KP_MINUS):
+                            self._change_solver_speed(0.5)
+
+                elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+                    queued_clicks.append(event)
+
+            while queued_clicks and not self.animator.busy:
+                event = queued_clicks.popleft()
+
+                if self._message_rect is not None and event.type == pygame.MOUSEBUTTONDOWN:
+                    self._erase_message() # Any click closes the message.
 
-            for event in pygame.event.get():
-                
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     tile_index = self._is_point_on_tile(event.pos)
                     if not is_solved and tile_index is not None:
@@ -281,40 +459,64 @@ class Game:
                         is_solve_pressed = True
                     elif is_solved and shuffle.check_btn_press(event.pos):
                         is_shuffle_pressed = True
+                    continue
 
-                elif event.type == pygame.MOUSEBUTTONUP:
-
-                    tile_index = self._is_point_on_tile(event.pos)
-                    if tile_index is not None and is_tile_pressed[tile_index]:
-                        self._move_tile(tile_index)
-                        if self.puzzle.is_solved():
-                            self._draw_solved_screen(shuffle)
-                            is_solved = True
-                            
-                    elif back.check_btn_press(event.pos) and is_back_pressed:
-                        return
-                    
-                    elif not is_solved and solve.check_btn_press(event.pos) and is_solve_pressed:
-                        self._solve(solve, back)
-                        back.draw()
-                        self._draw_solved_screen(shuffle)
+                tile_index = self._is_point_on_tile(event.pos)
+                if tile_index is not None and is_tile_pressed[tile_index]:
+                    self._move_tile(tile_index)
+                    if self.puzzle.is_solved():
                         is_solved = True
-                        pygame.event.clear() # Acceps player input after done drawing.
-
-                    elif is_solved and shuffle.check_btn_press(event.pos) and is_shuffle_pressed:
-                        self._draw_shuffled_screen(back, solve)
-                        is_solved = False
-                        pygame.event.clear() # Acceps player input after done drawing.
-
-                    # Reset mousedown trackers.
-                    for i in range(0,9): is_tile_pressed[i] = False
-                    is_back_pressed = False
-                    is_solve_pressed = False
-                    is_shuffle_pressed = False
+                        show_solved_screen = True
+
+                elif back.check_btn_press(event.pos) and is_back_pressed:
+                    return
+
+                elif not is_solved and solve.check_btn_press(event.pos) and is_solve_pressed:
+                    self._start_solving(solve, back, stop)
+                    queued_clicks.clear()
+
+                elif is_solved and shuffle.check_btn_press(event.pos) and is_shuffle_pressed:
+                    self._draw_shuffled_screen(back, solve)
+                    is_solved = False
+                    queued_clicks.clear()
+                    pygame.event.clear() # Acceps player input after done drawing.
+
+                # Reset mousedown trackers.
+                for i in range(0, self.size * self.size): is_tile_pressed[i] = False
+                is_back_pressed = False
+                is_solve_pressed = False
+                is_shuffle_pressed = False
+
+            if self._solve_future is not None and self._advance_solver():
+                self._solve_future = None
+                is_stop_pressed = False
+                self._dirty_rects.append(stop.erase(gc.BACKGROUND_COLOR))
+                self._dirty_rects.append(back.draw())
+                if self.puzzle.is_solved():
+                    is_solved = True
+                    show_solved_screen = True
+                else:
+                    self._dirty_rects.append(solve.draw()) # Stopped - the player can go on.
+
+            self._dirty_rects.extend(self.animator.update())
+            if show_solved_screen and not self.animator.busy:
+                self._draw_solved_screen(shuffle)
+                show_solved_screen = False
+            self._update_display()
+
+    def _next_frame(self, clock, idle):
+        """
+        Waits for the next frame of the play screen and returns its events. The simulation in 'simulate.py' hooks in here.
+        If 'idle' (no tile is sliding and the solver is not running) there is nothing to draw, so it sleeps until an event comes
+        or 'gc.IDLE_TIMEOUT' seconds pass instead of waking up 'gc.FPS' times a second.
+        """
+        if idle:
+            event = pygame.event.wait(round(gc.IDLE_TIMEOUT * 1000))
+            events = [event] if event.type != pygame.NOEVENT else []
+            return events + pygame.event.get()
 
-                elif event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+        clock.tick(gc.FPS)
+        return pygame.event.get()
 
     def _start_game(self):
         start_menu = StartMenu(self.screen)
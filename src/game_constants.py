@@ -1,9 +1,12 @@
 from pathlib import Path
 
-FPS = 240
+FPS = 240 # Frame rate while something moves. When nothing moves the game waits for input instead (see 'IDLE_TIMEOUT').
+IDLE_TIMEOUT = 1 # When nothing moves the game wakes up at least once in this many seconds.
 TILE_DRAW_DELAY = 10 # This many tiles per second get displayed one by one when the puzzle is shuffled.
 SLIDE_DURATION_PLAYER = 0.2 # This many seconds to finish the sliding animation of a tile when the player moves it.
 SLIDE_DURATION_SOLVER = 0.5 # This many seconds to finish the sliding animation of a tile when puzzle is solving itself.
+SOLVER_SPEED_LIMITS = (0.25, 16) # The player can slow the solver down or speed it up (up/down keys) this many times.
+SHUFFLE_DISTANCE = None # If set, a shuffled 8-puzzle takes exactly this many moves (1-31) to solve. Otherwise any solvable arrangement is equally likely.
 
 BACKGROUND_COLOR = (30, 30, 30)
 BUTTON_COLOR = (240, 240, 240)
@@ -24,7 +27,10 @@ PLAY_BTNS_HEIGHT = START_BTNS_HEIGHT
 START_MENU_BTNS_FONT_SIZE = 60
 PLAY_BTNS_FONT_SIZE = 48
 COUNTER_FONT_SIZE = 82
+MESSAGE_FONT_SIZE = 32
 
 GRANDPARENT_FOLDER = Path(__file__).parent.parent
-STATE_ACTION_MAP_PATH = Path(GRANDPARENT_FOLDER, 'q_tables\\state-action_map.pkl')
-PUZZLE_IMG_PATH = Path(GRANDPARENT_FOLDER, 'imgs\\Shake-the-room.png') 
\ No newline at end of file
+STATE_ACTION_MAP_PATH = Path(GRANDPARENT_FOLDER, 'q_tables', 'state-action_map.bin')
+PATTERN_DATABASES_PATH = Path(GRANDPARENT_FOLDER, 'q_tables', 'pattern_databases') # Used by the 15-puzzle solver.
+PUZZLE_IMG_PATH = Path(GRANDPARENT_FOLDER, 'imgs', 'Shake-the-room.png')
+TILE_ATLAS_CACHE_PATH = Path(GRANDPARENT_FOLDER, 'imgs', 'cache') # Scaled puzzle images (see 'tile_atlas.py'). 
\ No newline at end of file
@@ -0,0 +1,219 @@
+from pattern_database import load_pattern_databases
+from sliding_puzzle import SlidingPuzzleGame, hole_moves
+
+CANCEL_CHECK_NODES = 1 << 14 # Nodes between two checks of the 'cancelled' flag of a search (a few hundredths of a second).
+
+class _Cancelled(Exception):
+    pass
+
+class IDAStarSolver:
+    """
+    Finds the shortest solutions of the 15-puzzle with IDA* (iterative deepening A*).
+
+    The search is a depth-first search which gives up on a path as soon as the number of moves made plus the estimate of the
+    moves left is more than a bound. The bound starts at the estimate of the starting board and is raised to the smallest
+    value which went over it until a solution is found. The estimate is the sum of the additive pattern databases (see
+    'pattern_database.py'), so it is never too big and the first solution found is a shortest one.
+
+    The board mirrored along its main diagonal takes as many moves to solve as the board itself (the solved board is its own
+    mirror image, with tile 't' swapped for the tile in the mirrored cell), so the estimate is the bigger of the sums for the
+    board and its mirror image.
+
+    Moving a tile changes the index of only its own pattern, by the weight of the tile times the distance it moved, so every
+    node of the search costs two lookups instead of a full evaluation.
+    """
+
+    def __init__(self, databases):
+        """
+        'databases' are the 'PatternDatabase' objects of disjoint groups of tiles which together cover all tiles.
+        """
+        self.databases = databases
+        self.size = databases[0].size
+        self.nodes = 0 # Number of nodes expanded by the last call of 'solve()'.
+        self._actions = {} # Board of the last solutions (as a tuple) -> the action to take.
+
+        size = self.size
+        cells = size * size
+
+        # Group and weight of every tile, and the same for the tile it turns into in the mirror image.
+        self._groups = [0] * cells
+        self._weights = [0] * cells
+        for g, database in enumerate(databases):
+            for t, w in database.weights.items():
+                self._groups[t] = g
+                self._weights[t] = w
+
+        self._mirror_cells = [(c % size) * size + c // size for c in range(0, cells)]
+        mirror_tiles = [0] + [self._mirror_cells[t - 1] + 1 for t in range(1, cells)]
+        self._mirror_groups = [self._groups[mirror_tiles[t]] for t in range(0, cells)]
+        self._mirror_weights = [self._weights[mirror_tiles[t]] for t in range(0, cells)]
+        self._mirror_tiles = mirror_tiles
+
+        # Directions the hole can be moved in and the cells it moves to, by the position of the hole.
+        self._moves = tuple(tuple(moves.items()) for moves in hole_moves(size))
+
+    @classmethod
+    def load(cls, folder, build=True):
+        """
+        Creates a solver with the pattern databases in 'folder'. If 'build' is true, builds the databases first if they are
+        not there (about ten minutes), otherwise raises FileNotFoundError.
+        """
+        return cls(load_pattern_databases(folder, build=build))
+
+    def _indexes(self, board, mirror):
+        """
+        Returns the index of the placement of every pattern on 'board' (or on its mirror image).
+        """
+        indexes = [0] * len(self.databases)
+        for c, t in enumerate(board):
+            if t == 0:
+                continue
+            if mirror:
+                indexes[self._mirror_groups[t]] += self._mirror_cells[c] * self._mirror_weights[t]
+            else:
+                indexes[self._groups[t]] += c * self._weights[t]
+        return indexes
+
+    def solve(self, board, cancelled=None):
+        """
+        Returns a shortest list of directions u/r/d/l to move the hole in, which solves 'board'.
+        Throws an error if the board cannot be solved.
+        'cancelled' is an optional 'threading.Event' - once it is set, the search stops within 'CANCEL_CHECK_NODES' nodes and
+        returns None. A hard board takes seconds, so the game sets it when the player stops the solver or quits.
+        """
+        size = self.size
+        if sorted(board) != list(range(0, size * size)):
+            raise ValueError(f'The board must hold the numbers 0 to {size * size - 1}. Given {board}.')
+        if not SlidingPuzzleGame.is_board_solvable(board, size):
+            raise ValueError(f'The board {board} cannot be solved.')
+
+        board = list(board)
+        tables = [database.table for database in self.databases]
+        groups, weights = self._groups, self._weights
+        mirror_groups, mirror_weights, mirror_cells = self._mirror_groups, self._mirror_weights, self._mirror_cells
+        moves = self._moves
+
+        indexes = self._indexes(board, False)
+        mirror_indexes = self._indexes(board, True)
+        values = [table[i] for table, i in zip(tables, indexes)]
+        mirror_values = [table[i] for table, i in zip(tables, mirror_indexes)]
+
+        path = []
+        nodes = 0
+        check_nodes = CANCEL_CHECK_NODES
+        next_bound = float('inf') # The smallest estimate which went over the bound.
+
+        def search(hole, depth, bound, previous, h_sum, mirror_sum):
+            """
+            Searches from the current board, which was reached in 'depth' moves with the hole coming from 'previous'.
+            Returns true if a solution is found, in which case 'path' holds it.
+            """
+            nonlocal nodes, next_bound
+            nodes += 1
+            if nodes % check_nodes == 0 and cancelled is not None and cancelled.is_set():
+                raise _Cancelled()
+
+            for direction, c in moves[hole]:
+                if c == previous:
+                    continue # Don't undo the last move.
+
+                # The tile in cell 'c' slides into the hole.
+                t = board[c]
+                g = groups[t]
+                i = indexes[g] + (hole - c) * weights[t]
+                v = tables[g][i]
+                new_sum = h_sum - values[g] + v
+                f = depth + 1 + new_sum
+                if f > bound:
+                    if f < next_bound:
+                        next_bound = f
+                    continue # No need to look up the mirror image.
+
+                mg = mirror_groups[t]
+                mi = mirror_indexes[mg] + (mirror_cells[hole] - mirror_cells[c]) * mirror_weights[t]
+                mv = tables[mg][mi]
+                new_mirror_sum = mirror_sum - mirror_values[mg] + mv
+
+                f = depth + 1 + new_mirror_sum
+                if f > bound:
+                    if f < next_bound:
+                        next_bound = f
+                    continue
+
+                if new_sum == 0:
+                    path.append(direction)
+                    return True
+
+                old_i, old_v, old_mi, old_mv = indexes[g], values[g], mirror_indexes[mg], mirror_values[mg]
+                board[hole], board[c] = t, 0
+                indexes[g], values[g], mirror_indexes[mg], mirror_values[mg] = i, v, mi, mv
+
+                if search(c, depth + 1, bound, hole, new_sum, new_mirror_sum):
+                    path.append(direction)
+                    return True
+
+                board[hole], board[c] = 0, t
+                indexes[g], values[g], mirror_indexes[mg], mirror_values[mg] = old_i, old_v, old_mi, old_mv
+
+            return False
+
+        h_sum, mirror_sum = sum(values), sum(mirror_values)
+        bound = max(h_sum, mirror_sum)
+        if h_sum == 0:
+            # All tiles are in their cells - only the hole may be out of place (it is always in the bottom right cell).
+            self.nodes = 0
+            return []
+
+        # Solutions are at most 80 moves long, so the recursion never goes deep.
+        try:
+            while not search(board.index(0), 0, bound, None, h_sum, mirror_sum):
+                bound, next_bound = next_bound, float('inf')
+        except _Cancelled:
+            self.nodes = nodes
+            return None
+
+        path.reverse()
+        self.nodes = nodes
+        return path
+
+    def solve_path(self, board, cancelled=None):
+        """
+        Same as 'solve()', but a board along the last solution is answered with the rest of that solution without a search.
+        Returns None if the search was cancelled.
+        """
+        board = tuple(board)
+        if board not in self._actions:
+            path = self.solve(board, cancelled)
+            if path is None:
+                return None
+            self._remember(board, path)
+
+        step = SlidingPuzzleGame(self.size)
+        step.board = list(board)
+        path = []
+        while not step.is_solved():
+            path.append(self._actions[tuple(step.board)])
+            step.move_hole(path[-1])
+        return path
+
+    def _remember(self, board, path):
+        self._actions.clear()
+        step = SlidingPuzzleGame(self.size)
+        step.board = list(board)
+        for direction in path:
+            self._actions[tuple(step.board)] = direction
+            step.move_hole(direction)
+
+    def get_action(self, puzzle):
+        """
+        Given a puzzle, returns the next move of the hole u/r/d/l on a shortest solution, or None if it is solved.
+        The whole solution is found on the first call and remembered, so the next boards along it don't need a search.
+        """
+        if puzzle.is_solved():
+            return None
+
+        board = tuple(puzzle.board)
+        if board not in self._actions:
+            self._remember(board, self.solve(board))
+
+        return self._actions[board]
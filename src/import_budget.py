@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+FOLDER_PATH = Path(__file__).parent.parent
+BUDGET_PATH = Path(FOLDER_PATH, 'benchmarks', 'import_budget.json')
+REFERENCE_MODULE = 'asyncio' # Standard library module the budgets are measured against, see 'reference_scale()'.
+
+def measure(module, runs=5):
+    """
+    Imports 'module' in a new interpreter with '-X importtime', 'runs' times. Returns a dictionary of every module imported
+    -> (self time, cumulative time) in milliseconds, the smallest of all runs.
+    """
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    times = {}
+    for _ in range(0, runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=Path(__file__).parent, env=env, capture_output=True, text=True, check=True
+        )
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            name = name.strip()
+            self_ms, cumulative_ms = int(self_us) / 1000, int(cumulative_us) / 1000
+            if name in times:
+                self_ms, cumulative_ms = min(self_ms, times[name][0]), min(cumulative_ms, times[name][1])
+            times[name] = (self_ms, cumulative_ms)
+    return times
+
+def reference_ms(module, runs=5):
+    """
+    Returns the cumulative import time of 'module' in milliseconds, the best of 'runs' fresh interpreters.
+    """
+    return measure(module, runs)[module][1]
+
+def reference_scale(reference, runs=5):
+    """
+    Returns how much slower the import of the reference module is now than when the budgets were saved. 'reference' is
+    { "module": name, "ms": its import time then }. The budgets are multiplied by it, so they don't fail just because the
+    machine is slower (or busier) than the one they were saved on.
+    """
+    now = reference_ms(reference['module'], runs)
+    print(f'import {reference["module"]}: {now:.1f} ms, {reference["ms"]:g} ms when the budgets were saved', file=sys.stderr)
+    return now / reference['ms']
+
+def check(budgets, runs=5, top=10, scale=1.0):
+    """
+    Measures the import of every module in 'budgets' and prints the slowest modules to stderr.
+    'budgets' - module -> { "budget_ms": { module imported by it: most milliseconds its import may take }, "forbidden": [...] }
+    'scale' - factor the budgets are multiplied by (see 'reference_scale()').
+    Returns the list of problems: modules which took longer than their budget and forbidden modules which were imported.
+    """
+    problems = []
+    for module, budget in budgets.items():
+        times = measure(module, runs)
+        print(f'import {module}', file=sys.stderr)
+        print(f'  {"module":<32} {"self ms":>10} {"total ms":>10} {"budget":>10}', file=sys.stderr)
+        slowest = sorted(times.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        shown = dict(slowest, **{ name: times[name] for name in budget.get('budget_ms', {}) if name in times })
+        for name, (self_ms, cumulative_ms) in sorted(shown.items(), key=lambda item: item[1][1], reverse=True):
+            limit = budget.get('budget_ms', {}).get(name)
+            if limit is not None:
+                limit = round(limit * scale, 1)
+            status = ''
+            if limit is not None and cumulative_ms > limit:
+                status = ' OVER BUDGET'
+                problems.append(f'import {module}: {name} took {cumulative_ms:.1f} ms, the budget is {limit} ms.')
+            limit = '-' if limit is None else f'{limit:g}'
+            print(f'  {name:<32} {self_ms:>10.1f} {cumulative_ms:>10.1f} {limit:>10}{status}', file=sys.stderr)
+
+        for name in budget.get('forbidden', []):
+            if name in times:
+                problems.append(f'import {module}: imports {name}, which it must not.')
+    return problems
+
+if __name__ == '__main__':
+    """
+    Measures how long the game takes to import (the time before the window can open) with 'python -X importtime' and checks
+    it against the budgets in "benchmarks/import_budget.json". Exits with an error if a module took longer than its budget
+    or a module was imported which must not be (e.g. the training code).
+    The times are the best of '--runs' fresh interpreters. The budgets are scaled by how much slower the import of a
+    reference module of the standard library ('asyncio') is now than when they were saved, so a slower machine doesn't fail
+    the check. '--save-budget' saves the reference time and the measured times plus '--headroom' and '--slack-ms' - the
+    imports of a few milliseconds vary by more than the headroom from run to run.
+    Example:
+        python import_budget.py
+        python import_budget.py --save-budget --headroom 0.5
+    """
+
+    parser = argparse.ArgumentParser(description='Check the import time of the game against a budget.')
+    parser.add_argument('--budget', default=BUDGET_PATH, help='budget file')
+    parser.add_argument('--runs', type=int, default=5, help='imports to take the best time of (default 5)')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest modules to show (default 10)')
+    parser.add_argument('--save-budget', action='store_true', help='set the budgets to the measured times plus the headroom')
+    parser.add_argument('--headroom', type=float, default=0.5, help='fraction added to the measured times by --save-budget (default 0.5)')
+    parser.add_argument('--slack-ms', type=float, default=20, help='milliseconds added to every budget by --save-budget, on top of the headroom (default 20)')
+    args = parser.parse_args()
+
+    with open(args.budget) as f:
+        budget_file = json.load(f)
+    budgets = budget_file['budgets']
+
+    if args.save_budget:
+        budget_file['reference'] = { 'module': REFERENCE_MODULE, 'ms': round(reference_ms(REFERENCE_MODULE, args.runs), 1) }
+        for module, budget in budgets.items():
+            times = measure(module, args.runs)
+            budget['budget_ms'] = {
+                name: round(times[name][1] * (1 + args.headroom) + args.slack_ms, 1) for name in budget.get('budget_ms', {}) if name in times
+            }
+        with open(args.budget, 'w') as f:
+            json.dump(budget_file, f, indent=2)
+
+    scale = reference_scale(budget_file['reference'], args.runs)
+    problems = check(budgets, args.runs, args.top, scale)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        sys.exit(1)
@@ -0,0 +1,129 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+import time
+
+from q_learning import QLearning
+
+def _play_shard(parameters, q_table_bytes, generations, seed):
+    """
+    Runs in a worker process. Plays 'generations' games on a copy of the Q-table and returns the updated copy.
+    """
+    agent = QLearning(**parameters)
+    q_table = array('f')
+    q_table.frombytes(q_table_bytes)
+    agent._play_games(q_table, generations, random.Random(seed), verbose=False)
+    return q_table.tobytes()
+
+class ParallelQLearning(QLearning):
+    """
+    Same Q-learning algorithm as 'QLearning' but the games are split between 'workers' processes.
+
+    Training goes in rounds. In every round each worker gets a copy of the Q-table, plays 'sync_interval' games with its own
+    random generator and sends its copy back. The copies are then merged into one table which is used in the next round.
+
+    The copies are merged by taking the biggest value of every state-action pair. The only reward is given for solving the
+    puzzle and every update only passes back values which were already found, so with 'learning_rate=1.0' the values never go
+    above the true ones - a bigger value means that a shorter solution has been found by one of the workers.
+
+    The random generators are seeded with 'seed', the round and the worker number, and the copies are merged in worker order,
+    so the result is the same for the same 'seed' and 'workers'.
+    """
+
+    def __init__(self, learning_rate, discount_factor, generations, max_steps, exploration_probability, start_distance=None, workers=None, sync_interval=25000, seed=0):
+        super().__init__(learning_rate, discount_factor, generations, max_steps, exploration_probability, start_distance)
+        self.workers = workers or os.cpu_count() # Number of worker processes.
+        self.sync_interval = sync_interval # Number of games every worker plays before the tables are merged.
+        self.seed = seed
+
+    def _parameters(self):
+        return dict(
+            learning_rate=self.learning_rate,
+            discount_factor=self.discount_factor,
+            generations=0,
+            max_steps=self.max_steps,
+            exploration_probability=self.exploration_probability,
+            start_distance=self.start_distance
+        )
+
+    @staticmethod
+    def _merge(tables):
+        """
+        Returns a table with the biggest value of every state-action pair in 'tables' (the bytes of the Q-tables).
+        """
+        q_table = array('f')
+        if len(tables) == 1:
+            q_table.frombytes(tables[0])
+            return q_table
+
+        import numpy as np # Only needed with more than one worker.
+        merged = np.frombuffer(tables[0], dtype=np.float32).copy()
+        for table in tables[1:]:
+            np.maximum(merged, np.frombuffer(table, dtype=np.float32), out=merged)
+        q_table.frombytes(merged.tobytes())
+        return q_table
+
+    def train(self):
+        q_table = self._generate_q_table()
+        parameters = self._parameters()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            completed = 0
+            sync_round = 0
+            while completed < self.generations:
+                # Split the games of this round as evenly as possible.
+                games = min(self.sync_interval * self.workers, self.generations - completed)
+                shares = [games // self.workers + (1 if w < games % self.workers else 0) for w in range(0, self.workers)]
+
+                q_table_bytes = q_table.tobytes()
+                futures = [
+                    pool.submit(_play_shard, parameters, q_table_bytes, share, f'{self.seed}/{sync_round}/{w}')
+                    for w, share in enumerate(shares) if share > 0
+                ]
+
+                q_table = self._merge([future.result() for future in futures])
+
+                completed += games
+                sync_round += 1
+                print(f'{completed} generations completed.')
+
+        self.table = self._get_policy(q_table)
+
+def scaling_report(generations, max_workers=None, sync_interval=25000):
+    """
+    Trains with 1, 2, 4, ... up to 'max_workers' workers (by default the number of cores) on the same number of generations
+    and prints the time, the speedup over one worker and the parallel efficiency.
+    Returns a list of (workers, seconds) pairs.
+    """
+    max_workers = max_workers or os.cpu_count()
+
+    worker_counts = []
+    w = 1
+    while w < max_workers:
+        worker_counts.append(w)
+        w *= 2
+    worker_counts.append(max_workers)
+
+    results = []
+    for workers in worker_counts:
+        agent = ParallelQLearning(
+            learning_rate=1.0,
+            discount_factor=0.92,
+            generations=generations,
+            max_steps=40,
+            exploration_probability=1.0,
+            workers=workers,
+            sync_interval=sync_interval
+        )
+
+        start = time.perf_counter()
+        agent.train()
+        results.append((workers, time.perf_counter() - start))
+
+    print(f'{"workers":>8} {"seconds":>10} {"speedup":>8} {"efficiency":>10}')
+    for workers, seconds in results:
+        speedup = results[0][1] / seconds
+        print(f'{workers:>8} {seconds:>10.2f} {speedup:>8.2f} {speedup / workers:>10.0%}')
+
+    return results
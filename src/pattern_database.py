@@ -0,0 +1,222 @@
+"""
+Additive pattern databases for the 15-puzzle (4x4), stored on disk as byte arrays.
+
+A pattern database is made for a group of tiles (the pattern). It holds the least number of moves of the pattern tiles it takes
+to bring them to their solved cells, for every placement of the pattern tiles. The other tiles can't be told apart and their
+moves are not counted. Every move moves one tile, which belongs to exactly one group, so the values of disjoint groups can be
+added up and the sum is still never more than the real number of moves (an admissible heuristic for 'IDAStarSolver').
+
+The placement of the tiles 't_0, t_1, ..., t_(k-1)' of a pattern is stored at index
+    cell(t_0) * 16^(k-1) + cell(t_1) * 16^(k-2) + ... + cell(t_(k-1))
+so moving one tile changes the index by a fixed amount and the search never has to rank a placement. Indexes which are not
+placements (two tiles in one cell) are left as 255.
+
+    offset  size    content
+    0       4       magic bytes b'15PD'
+    4       2       format version (little-endian), currently 1
+    6       1       side length of the board, 4
+    7       1       number of tiles in the pattern 'k'
+    8       4       CRC-32 of the table (little-endian)
+    12      8       the tiles of the pattern, padded with zeros
+    20      16^k    the table
+
+A file is opened with 'mmap', so the table is not copied into the memory of the process. It is read through once when the
+file is opened, to check the checksum (a few tens of milliseconds for all databases).
+"""
+
+import mmap
+from pathlib import Path
+import struct
+import zlib
+
+MAGIC = b'15PD'
+VERSION = 1
+UNREACHED = 255
+
+# Tiles 1 to 15 are split into three groups of 6, 6 and 3 tiles:
+#    1  2  3  4       A  C  C  C
+#    5  6  7  8       A  A  B  B
+#    9 10 11 12       A  A  B  B
+#   13 14 15          A  B  B
+PARTITION = ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4))
+
+_HEADER = struct.Struct('<4sHBBI8s')
+
+
+def _neighbours(size):
+    """
+    Returns a (size * size, 4) table with the cell up/right/down/left of every cell, or -1 if there is none.
+    """
+    cells = []
+    for c in range(0, size * size):
+        row, col = divmod(c, size)
+        cells.append((
+            c - size if row > 0 else -1,
+            c + 1 if col < size - 1 else -1,
+            c + size if row < size - 1 else -1,
+            c - 1 if col > 0 else -1
+        ))
+    return cells
+
+
+def build_pattern_database(tiles, size=4, chunk_size=2000000):
+    """
+    Returns the table of the pattern 'tiles' as a 'bytearray' of (size * size)^k bytes. Requires NumPy.
+
+    Breadth-first search from the solved board over the placements of the pattern tiles together with the cell of the hole.
+    Moving the hole to a cell which is not taken by a pattern tile is free (it moves one of the ignored tiles); swapping the
+    hole with a pattern tile costs one move. All states at one distance are expanded together as NumPy arrays, 'chunk_size'
+    states at a time: first everything the hole can reach for free gets the same distance, then every pattern tile next to
+    the hole is moved and the states which are not reached yet get the next distance. The value of a placement is the least
+    distance over all cells of the hole.
+
+    The search goes through (size * size)^(k+1) states - for a 6-tile pattern that is a 268 MB array (about 1 GB of memory
+    in total) and a few minutes.
+    """
+    import numpy as np
+
+    k = len(tiles)
+    cells = size * size
+    # The cell of the hole is the last digit of the index of a state.
+    weights = np.array([cells ** (k - j) for j in range(0, k)] + [1], dtype=np.int64)
+    neighbours = np.array(_neighbours(size), dtype=np.int64)
+
+    def expand(states, moves):
+        """
+        Calls 'moves(states, placements, hole)' for the states in chunks and returns the states it reached.
+        """
+        reached = []
+        for start in range(0, len(states), chunk_size):
+            chunk = states[start:start + chunk_size]
+            placements = (chunk[:, None] // weights) % cells # Cell of every tile and of the hole, one state per row.
+            reached.extend(moves(chunk, placements, placements[:, k]))
+        return np.unique(np.concatenate(reached)) if reached else np.empty(0, dtype=np.int64)
+
+    def free_moves(chunk, placements, hole):
+        for d in range(0, 4):
+            targets = neighbours[hole, d]
+            free = (targets >= 0) & ~np.any(placements[:, :k] == targets[:, None], axis=1)
+            yield chunk[free] + targets[free] - hole[free]
+
+    def tile_moves(chunk, placements, hole):
+        for j in range(0, k):
+            for d in range(0, 4):
+                targets = neighbours[hole, d]
+                swap = (targets >= 0) & (placements[:, j] == targets)
+                yield chunk[swap] + (hole[swap] - targets[swap]) * (weights[j] - 1)
+
+    states = np.full(cells ** (k + 1), UNREACHED, dtype=np.uint8)
+    frontier = np.array([sum((t - 1) * int(w) for t, w in zip(tiles, weights)) + cells - 1], dtype=np.int64)
+    states[frontier] = 0
+
+    distance = 0
+    while len(frontier):
+        # Everything the hole can reach for free.
+        layer = [frontier]
+        new = frontier
+        while len(new):
+            new = expand(new, free_moves)
+            new = new[states[new] == UNREACHED]
+            states[new] = distance
+            layer.append(new)
+
+        new = expand(np.concatenate(layer), tile_moves)
+        frontier = new[states[new] == UNREACHED]
+        states[frontier] = distance + 1
+        distance += 1
+
+    return bytearray(states.reshape(-1, cells).min(axis=1).tobytes())
+
+
+def write_pattern_database(file_name, tiles, table, size=4):
+    """
+    Writes the table of the pattern 'tiles' (as made by 'build_pattern_database()'). Raises an exception if the file
+    already exists.
+    """
+    header = _HEADER.pack(MAGIC, VERSION, size, len(tiles), zlib.crc32(table), bytes(tiles))
+    with open(file_name, 'xb') as f:
+        f.write(header)
+        f.write(table)
+
+
+class PatternDatabase:
+    """
+    Read-only pattern database, mapped into memory.
+    Raises an error if the header is not valid or the checksum doesn't match.
+    """
+
+    def __init__(self, file_name):
+        with open(file_name, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f'{file_name} is too short to be a pattern database.')
+
+        magic, version, size, k, checksum, tiles = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f'{file_name} is not a pattern database.')
+        if version != VERSION or not 0 < k <= 8:
+            raise ValueError(f'Unsupported pattern database format: version {version}, {k} tiles.')
+
+        self.size = size # Side length of the board.
+        self.tiles = tuple(tiles[:k]) # The tiles of the pattern.
+        # Weight of the cell of every pattern tile in the index of a placement.
+        self.weights = { t: (size * size) ** (k - 1 - j) for j, t in enumerate(self.tiles) }
+        self.table = memoryview(self._map)[_HEADER.size:] # The value of placement 'i' is 'table[i]'.
+
+        if len(self.table) != (size * size) ** k or zlib.crc32(self.table) != checksum:
+            self.close()
+            raise ValueError(f'{file_name} is corrupted.')
+
+    def index(self, board):
+        """
+        Returns the index of the placement of the pattern tiles on 'board'.
+        """
+        return sum(board.index(t) * w for t, w in self.weights.items())
+
+    def get(self, board):
+        """
+        Returns the least number of moves of the pattern tiles it takes to bring them to their solved cells.
+        """
+        return self.table[self.index(board)]
+
+    def close(self):
+        self.table.release()
+        self._map.close()
+
+
+def pattern_file_name(tiles):
+    return f'pattern_{"-".join(map(str, tiles))}.pdb'
+
+
+def load_pattern_databases(folder, partition=PARTITION, build=True):
+    """
+    Opens the databases of the groups in 'partition' from 'folder'. If 'build' is true, databases which are not in the folder
+    yet are built and saved there first (see 'build_pattern_database()').
+    """
+    databases = []
+    for tiles in partition:
+        path = Path(folder, pattern_file_name(tiles))
+        if build and not path.exists():
+            Path(folder).mkdir(parents=True, exist_ok=True)
+            write_pattern_database(path, tiles, build_pattern_database(tiles))
+        databases.append(PatternDatabase(path))
+    return databases
+
+
+if __name__ == '__main__':
+    """
+    Builds the pattern databases of 'PARTITION' used by the 15-puzzle solver. Databases which are already in the folder are
+    kept. Takes about ten minutes and 1 GB of memory.
+    Example:
+        python pattern_database.py "../q_tables/pattern_databases"
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the pattern databases of the 15-puzzle solver.')
+    parser.add_argument('folder', help='folder to save the databases in')
+    args = parser.parse_args()
+
+    for database in load_pattern_databases(args.folder):
+        print(f'{pattern_file_name(database.tiles)}: {len(database.table)} bytes')
+        database.close()
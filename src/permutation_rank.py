@@ -0,0 +1,160 @@
+"""
+Dense numbering of the solvable board arrangements.
+
+Every one of the 9!/2 = 181440 solvable boards gets a unique index (rank) from 0 to 181439, so tables over all states can be
+stored in flat arrays instead of dictionaries keyed by 'sliding_puzzle.board_key()'.
+
+The rank is made of two parts - the position of the hole and the Lehmer code of the permutation of the tiles 1 to 8 (read row
+by row, skipping the hole):
+    rank = hole_index * 20160 + lehmer_rank // 2
+Swapping the last two tiles changes the Lehmer rank by one and flips the parity of the permutation, so the solvable (even)
+permutations are exactly one of each pair 2k, 2k+1 and 'lehmer_rank // 2' numbers them without gaps.
+"""
+
+from array import array
+from itertools import permutations
+
+STATE_COUNT = 181440 # Number of solvable board arrangements.
+PERMUTATIONS_PER_HOLE = 20160 # Even permutations of the tiles 1 to 8.
+SOLVED_RANK = 8 * PERMUTATIONS_PER_HOLE # Rank of [1,2,3,4,5,6,7,8,0].
+
+# Index and bit offset of each board cell in a packed state (see 'PackedSlidingPuzzle').
+_CELLS = tuple((i, 4 * (8 - i)) for i in range(0, 9))
+
+# _LOWER_BITS[n] has the bits for the numbers 1 to n-1 set.
+_LOWER_BITS = tuple(((1 << n) - 1) & ~1 for n in range(0, 9))
+# Number of set bits of every 9-bit mask.
+_BIT_COUNTS = tuple(m.bit_count() for m in range(0, 512))
+
+_move_table = None # Made by 'move_table()' the first time it is needed, shared by the whole process.
+
+
+def rank(board):
+    """
+    Returns the index of a solvable board. 'board' is a sequence of the numbers 0 to 8 (0 is the hole).
+    Raises an error if the board is not solvable.
+    """
+    hole = 0
+    seen = 0
+    lehmer = 0
+    inversions = 0
+    radix = 8
+    for i, n in enumerate(board):
+        if n == 0:
+            hole = i
+            continue
+
+        digit = n - 1 - (seen & _LOWER_BITS[n]).bit_count()
+        lehmer = lehmer * radix + digit
+        inversions += digit
+        seen |= 1 << n
+        radix -= 1
+
+    if inversions % 2 == 1:
+        raise ValueError(f'The board is not solvable. Given {list(board)}.')
+
+    return hole * PERMUTATIONS_PER_HOLE + lehmer // 2
+
+
+def rank_packed(state):
+    """
+    Same as 'rank()' but takes a board packed in an integer with 4 bits per cell (see 'PackedSlidingPuzzle.state').
+    Expects a solvable board.
+    """
+    hole = 0
+    seen = 0
+    lehmer = 0
+    radix = 8
+    for i, shift in _CELLS:
+        n = (state >> shift) & 0xF
+        if n:
+            lehmer = lehmer * radix + n - 1 - _BIT_COUNTS[seen & _LOWER_BITS[n]]
+            seen |= 1 << n
+            radix -= 1
+        else:
+            hole = i
+
+    return hole * PERMUTATIONS_PER_HOLE + lehmer // 2
+
+
+def rank_after_move(index, state, tile_index, hole_index):
+    """
+    Returns the index of the board after the tile in position 'tile_index' slid into the hole in position 'hole_index'.
+    'index' is the index of the board before the move and 'state' is the packed board after the move.
+    A horizontal slide doesn't change the order of the tiles, so only the hole part of the index changes.
+    """
+    if tile_index == hole_index + 3 or tile_index == hole_index - 3:
+        return rank_packed(state)
+    return index + (tile_index - hole_index) * PERMUTATIONS_PER_HOLE
+
+
+def unrank(index):
+    """
+    Returns the board (a list of the numbers 0 to 8) with the given index. The inverse of 'rank()'.
+    """
+    if index < 0 or STATE_COUNT <= index:
+        raise ValueError(f'Index must be 0 <= index < {STATE_COUNT}. Given {index}.')
+
+    hole, half = divmod(index, PERMUTATIONS_PER_HOLE)
+
+    # Decode the Lehmer digits of the even candidate '2 * half'. Its second to last digit is 0.
+    digits = [0] * 8
+    lehmer = half * 2
+    for radix in range(1, 9):
+        lehmer, digits[8 - radix] = divmod(lehmer, radix)
+
+    # If '2 * half' is odd, the solvable permutation is '2 * half + 1' - swap the last two tiles.
+    if sum(digits) % 2 == 1:
+        digits[6] = 1
+
+    available = [1, 2, 3, 4, 5, 6, 7, 8]
+    board = [available.pop(d) for d in digits]
+    board.insert(hole, 0)
+    return board
+
+
+def hole_index(index):
+    """
+    Returns the position of the hole on the board with the given index.
+    """
+    return index // PERMUTATIONS_PER_HOLE
+
+
+def move_table():
+    """
+    Returns the index of the board after every move as a flat array - the entry '4 * index + a' is the index of the board
+    after moving the hole of the board 'index' in the direction 'a' (0-3 for up/right/down/left), or -1 if the hole cannot
+    move that way. The table is made the first time it is needed (about half a second) and then shared by the whole process.
+    """
+    global _move_table
+
+    if _move_table is None:
+        # 'permutations()' goes through the permutations in the order of their Lehmer ranks, so of every pair 2k, 2k+1 the
+        # even one is the permutation with index k.
+        ordered = permutations(range(1, 9))
+        tiles = []
+        for p, q in zip(ordered, ordered):
+            inversions = sum(a > b for i, a in enumerate(p) for b in p[i + 1:])
+            tiles.append(p if inversions % 2 == 0 else q)
+        indexes = { p: i for i, p in enumerate(tiles) }
+
+        table = array('i', [-1]) * (4 * STATE_COUNT)
+        for index in range(0, STATE_COUNT):
+            hole = index // PERMUTATIONS_PER_HOLE
+            if hole % 3 != 2:
+                table[4 * index + 1] = index + PERMUTATIONS_PER_HOLE
+            if hole % 3 != 0:
+                table[4 * index + 3] = index - PERMUTATIONS_PER_HOLE
+
+        # Moving the hole down from 'hole' to 'hole + 3' puts the tile from 'hole + 3' in front of the two tiles in between.
+        # Moving it back up undoes that.
+        for hole in range(0, 6):
+            for i, p in enumerate(tiles):
+                index = hole * PERMUTATIONS_PER_HOLE + i
+                moved = (hole + 3) * PERMUTATIONS_PER_HOLE + indexes[p[:hole] + (p[hole + 2],) + p[hole:hole + 2] + p[hole + 3:]]
+                table[4 * index + 2] = moved
+                table[4 * moved] = index
+
+        _move_table = table
+
+    return _move_table
@@ -1,5 +1,11 @@
+import argparse
+
 from game import Game
 
 # Play the game.
 if __name__ == '__main__':
-    Game()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Play the sliding puzzle.')
+    parser.add_argument('--size', type=int, choices=[3, 4], default=3, help='3 for the 8-puzzle (default), 4 for the 15-puzzle')
+    args = parser.parse_args()
+
+    Game(size=args.size)
@@ -0,0 +1,78 @@
+from array import array
+from collections import Counter, namedtuple
+
+import permutation_rank as pr
+from policy_file import Policy
+from sliding_puzzle import HOLE_MOVES, PackedSlidingPuzzle
+
+PolicyEvaluation = namedtuple('PolicyEvaluation', [
+    'histogram', # Counter - number of moves to solve -> number of states which take that many moves.
+    'looping', # List of the indexes of the states which the policy never solves.
+    'hardest_board', # The board which takes the most moves to solve.
+    'most_moves' # Number of moves it takes to solve 'hardest_board'.
+])
+
+_UNKNOWN = -1
+_ON_PATH = -2 # The state is on the path we are following right now.
+_LOOPING = -3 # The policy never reaches the solved state from here.
+
+def evaluate_policy(table):
+    """
+    Finds how many moves the state-action map 'table' (a dictionary or a 'Policy', e.g. a 'PolicyFile') takes to
+    solve every reachable state.
+
+    Following the policy from a state always leads to the same next state, so the policy is a function from states to
+    states and the solutions of the states along one path share their ends. We follow the policy from every state until we
+    get to a state whose number of moves is already known and then go back along the path, adding one move per step. If the
+    path runs into itself, all states on it are looping. Every state is visited once.
+
+    An action which cannot be taken (e.g. moving the hole up from the top row) or is missing also counts as looping.
+    """
+    if isinstance(table, Policy):
+        action_of = lambda state, r: table.action(r)
+    else:
+        # The cells hold the digits 0-8, so the packed board written in hex is the decimal key of the board.
+        action_of = lambda state, r: table.get(int(f'{state:09x}'))
+
+    moves = array('i', [_UNKNOWN]) * pr.STATE_COUNT
+    moves[pr.SOLVED_RANK] = 0
+
+    puzzle = PackedSlidingPuzzle()
+    path = []
+    for start in range(0, pr.STATE_COUNT):
+        if moves[start] != _UNKNOWN:
+            continue
+
+        puzzle.board = pr.unrank(start)
+        state, h_i, r = puzzle.state, puzzle.hole, start
+
+        # Follow the policy until we get to a state we have seen before.
+        while moves[r] == _UNKNOWN:
+            moves[r] = _ON_PATH
+            path.append(r)
+
+            t_i = HOLE_MOVES[h_i].get(action_of(state, r))
+            if t_i is None:
+                break
+
+            # Move the hole (see 'PackedSlidingPuzzle._slide()').
+            tile = (state >> 4 * (8 - t_i)) & 0xF
+            state += (tile << 4 * (8 - h_i)) - (tile << 4 * (8 - t_i))
+            r = pr.rank_after_move(r, state, t_i, h_i)
+            h_i = t_i
+
+        # Go back along the path.
+        end = moves[r]
+        if end < 0:
+            for p in path:
+                moves[p] = _LOOPING
+        else:
+            for p in reversed(path):
+                end += 1
+                moves[p] = end
+        path.clear()
+
+    histogram = Counter(m for m in moves if m >= 0)
+    looping = [r for r in range(0, pr.STATE_COUNT) if moves[r] == _LOOPING]
+    most_moves = max(histogram)
+    return PolicyEvaluation(histogram, looping, pr.unrank(moves.index(most_moves)), most_moves)
@@ -0,0 +1,151 @@
+"""
+Compact binary format of the state-action map.
+
+    offset  size    content
+    0       4       magic bytes b'8PZP'
+    4       2       format version (little-endian), currently 1
+    6       2       bits per action (little-endian), always 2
+    8       4       number of states (little-endian), 181440
+    12      4       CRC-32 of the actions (little-endian)
+    16      45360   actions
+
+Every action takes 2 bits - 0, 1, 2, 3 for moving the hole up, right, down, left. The action of the board with index 'r' (see
+'permutation_rank.rank()') is in byte 16 + r // 4, bits 2 * (r % 4) and 2 * (r % 4) + 1. The solved board has no action and
+is stored as 0.
+
+A file is opened with 'mmap', so looking up an action doesn't need the file to be parsed first. The trainers keep their
+result in the same packed form in memory ('Policy') instead of a dictionary of all boards.
+"""
+
+import mmap
+import struct
+import zlib
+
+import permutation_rank as pr
+
+MAGIC = b'8PZP'
+VERSION = 1
+BITS_PER_ACTION = 2
+ACTIONS = ('u', 'r', 'd', 'l')
+
+_HEADER = struct.Struct('<4sHHII')
+_ACTIONS_SIZE = pr.STATE_COUNT * BITS_PER_ACTION // 8
+
+
+def write_policy(file_name, table):
+    """
+    Writes a state-action map (a 'Policy' or a dictionary with keys the boards as numbers, see 'sliding_puzzle.board_key()')
+    in the binary format. Raises an exception if the file already exists.
+    """
+    if isinstance(table, Policy):
+        actions = table.actions
+    else:
+        codes = { action: code for code, action in enumerate(ACTIONS) }
+        actions = bytearray(_ACTIONS_SIZE)
+        for key, action in table.items():
+            if action is None:
+                continue
+
+            board = [int(digit) for digit in f'{key:09d}']
+            r = pr.rank(board)
+            actions[r >> 2] |= codes[action] << ((r & 3) * 2)
+
+    header = _HEADER.pack(MAGIC, VERSION, BITS_PER_ACTION, pr.STATE_COUNT, zlib.crc32(actions))
+    with open(file_name, 'xb') as f:
+        f.write(header)
+        f.write(actions)
+
+
+def save_table(file_name, table):
+    """
+    Saves a state-action map. Files with the '.bin' extension are written in the binary format; all others are pickled
+    (a 'Policy' is pickled as a dictionary, see 'Policy.to_table()'). Raises an exception if the file already exists.
+    """
+    if str(file_name).endswith('.bin'):
+        write_policy(file_name, table)
+    else:
+        import pickle # Not needed to read the binary format, so the game doesn't import it.
+        if isinstance(table, Policy):
+            table = table.to_table()
+        with open(file_name, 'xb') as f:
+            pickle.dump(table, f) # Save the dictionary in binary format.
+
+
+def is_policy_file(file_name):
+    """
+    Returns true if the file starts with the magic bytes of the binary format.
+    """
+    with open(file_name, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class Policy:
+    """
+    State-action map in memory - the actions of the binary format, 2 bits per board, without the header. Takes 45 KB
+    instead of the 15 MB of a dictionary of all boards. 'actions' is a bytes-like object of 45360 bytes.
+    """
+
+    def __init__(self, actions):
+        if len(actions) != _ACTIONS_SIZE:
+            raise ValueError(f'A state-action map has {_ACTIONS_SIZE} bytes of actions, not {len(actions)}.')
+        self.actions = actions
+
+    @classmethod
+    def from_codes(cls, codes):
+        """
+        Makes the map from the codes of the actions (0, 1, 2, 3 for up, right, down, left) of the boards in the order of
+        their indexes. The code of the solved board is ignored.
+        """
+        actions = bytearray(_ACTIONS_SIZE)
+        for r, code in enumerate(codes):
+            if r != pr.SOLVED_RANK:
+                actions[r >> 2] |= code << ((r & 3) * 2)
+        return cls(actions)
+
+    def action(self, r):
+        """
+        Returns the action for the board with index 'r'.
+        """
+        return ACTIONS[(self.actions[r >> 2] >> ((r & 3) * 2)) & 3]
+
+    def to_table(self):
+        """
+        Returns the state-action map as a dictionary (the format of the pickled maps).
+        """
+        table = {}
+        for r in range(0, pr.STATE_COUNT):
+            board = pr.unrank(r)
+            key = 0
+            for n in board:
+                key = key * 10 + n
+            table[key] = self.action(r)
+        table[123456780] = None # The solved board has no action.
+        return table
+
+
+class PolicyFile(Policy):
+    """
+    Read-only state-action map in the binary format, mapped into memory.
+    Raises an error if the header is not valid or the checksum doesn't match.
+    """
+
+    def __init__(self, file_name):
+        with open(file_name, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f'{file_name} is too short to be a state-action map.')
+
+        magic, version, bits, count, checksum = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f'{file_name} is not a state-action map.')
+        if version != VERSION or bits != BITS_PER_ACTION or count != pr.STATE_COUNT:
+            raise ValueError(f'Unsupported state-action map format: version {version}, {bits} bits per action, {count} states.')
+        if len(self._map) != _HEADER.size + _ACTIONS_SIZE or zlib.crc32(self._map[_HEADER.size:]) != checksum:
+            raise ValueError(f'{file_name} is corrupted.')
+
+        super().__init__(memoryview(self._map)[_HEADER.size:])
+
+    def close(self):
+        self.actions.release()
+        self._map.close()
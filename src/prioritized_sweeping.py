@@ -0,0 +1,97 @@
+import heapq
+
+import permutation_rank as pr
+from q_learning import ACTIONS
+from sliding_puzzle import OPPOSITE
+
+class PrioritizedSweeping:
+    """
+    Spreads the changes of the Q-table of 'QLearning' backward without playing more games (prioritized sweeping).
+
+    A Q-learning update only changes the value of the state the move was made in, and the states which lead to it learn
+    about the change only when a game happens to pass through them again. The moves of the puzzle are known and always
+    have the same result, so the states which lead to a state in one move (its predecessors - every move can be undone,
+    so they are its neighbours) are known too, and their Q-values for that move can be updated right away.
+
+    When the value of a state (its best Q-value) changes, the state is put in a priority queue with the size of the change
+    as its priority. 'sweep()' takes out the states with the biggest changes and updates the Q-value of the move from
+    every predecessor to the state; a predecessor whose value changed by more than 'threshold' goes into the queue in turn.
+    The queue holds at most 'queue_size' states - when it gets longer, the states with the smallest changes are dropped.
+    """
+
+    def __init__(self, q_table, learning_rate, discount_factor, queue_size=100000, threshold=1e-5):
+        self.q_table = q_table
+        self.learning_rate = learning_rate
+        self.discount_factor = discount_factor
+        self.queue_size = queue_size
+        self.threshold = threshold
+        self.updates = 0 # Number of Q-values updated by sweeps.
+
+        self._heap = [] # (-priority, state). A state may be in it more than once - only the entry in '_priorities' counts.
+        self._priorities = {} # State -> its priority in the queue.
+        self._moves = pr.move_table()
+
+    def __len__(self):
+        return len(self._priorities)
+
+    def value(self, state):
+        """
+        Returns the best Q-value of the state (the reward of the solved state, which has no actions).
+        """
+        if state == pr.SOLVED_RANK:
+            return 1.0
+        i = state * 4
+        return max(self.q_table[i:i + 4])
+
+    def push(self, state, change):
+        """
+        Queues the predecessors of 'state' for an update, because its value changed by 'change'. Does nothing if the change
+        is not bigger than the threshold.
+        """
+        change = abs(change)
+        if change <= self.threshold or change <= self._priorities.get(state, 0):
+            return
+
+        self._priorities[state] = change
+        heapq.heappush(self._heap, (-change, state))
+        if len(self._heap) > 2 * self.queue_size:
+            # Keep the states with the biggest changes. Old entries of states which were queued again or already swept are
+            # dropped first - they would bring back priorities which don't count any more. A sorted list is a heap.
+            priorities = self._priorities
+            current = [(priority, s) for priority, s in self._heap if priorities.get(s) == -priority]
+            self._heap = heapq.nsmallest(self.queue_size, current)
+            self._priorities = { s: -priority for priority, s in self._heap }
+
+    def sweep(self, n):
+        """
+        Updates the predecessors of up to 'n' states from the queue, biggest change first. Returns the number of states.
+        """
+        heap, priorities = self._heap, self._priorities
+        for swept in range(0, n):
+            while heap:
+                priority, state = heapq.heappop(heap)
+                if priorities.get(state) == -priority:
+                    del priorities[state]
+                    break
+            else:
+                return swept
+
+            self._update_predecessors(state)
+        return n
+
+    def _update_predecessors(self, state):
+        q_table = self.q_table
+        # Moving into the solved state gives the reward, other moves give the discounted value of the state they lead to.
+        target = 1.0 if state == pr.SOLVED_RANK else self.discount_factor * self.value(state)
+
+        for a, direction in enumerate(ACTIONS):
+            predecessor = self._moves[state * 4 + a]
+            if predecessor == -1 or predecessor == pr.SOLVED_RANK:
+                continue # The hole can't move that way, or the game ends in the solved state and nothing leads out of it.
+
+            # Moving the hole back leads from the predecessor to the state.
+            i = predecessor * 4 + ACTIONS.index(OPPOSITE[direction])
+            old_value = self.value(predecessor)
+            q_table[i] += self.learning_rate * (target - q_table[i])
+            self.updates += 1
+            self.push(predecessor, self.value(predecessor) - old_value)
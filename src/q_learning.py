@@ -1,98 +1,108 @@
-import copy
-import itertools
-import pickle
+from array import array
 import random
 
-from sliding_puzzle import SlidingPuzzleGame
+import permutation_rank as pr
+from policy_evaluation import evaluate_policy
+from policy_file import Policy, save_table
+from sliding_puzzle import board_key
+from state_sampler import StateSampler
+
+ACTIONS = ('u', 'r', 'd', 'l') # Order of the actions of a state in the Q-table.
+
+# Possible actions according to the position of the hole.
+POSSIBLE_ACTIONS = {
+    0: ('r', 'd'),
+    1: ('r', 'd', 'l'),
+    2: ('d', 'l'),
+    3: ('u', 'r', 'd'),
+    4: ('u', 'r', 'd', 'l'),
+    5: ('u', 'd', 'l'),
+    6: ('u', 'r'),
+    7: ('u', 'r', 'l'),
+    8: ('u', 'l')
+}
 
 class QLearning:
 
-    def __init__(self, learning_rate, discount_factor, generations, max_steps, exploration_probability):
+    def __init__(self, learning_rate, discount_factor, generations, max_steps, exploration_probability, start_distance=None,
+                 sweeps=0, sweep_queue_size=100000, curriculum=None):
         self.learning_rate = learning_rate # Must be 0 < lr <= 1
         self.discount_factor = discount_factor # Must be 0 <= df <= 1. The higher the number, the more valuable future rewards are.
         self.generations = generations # Number of games to play when training.
         self.max_steps = max_steps # Max steps in a game before it is reset.
         self.exploration_probability = exploration_probability # Must be 0 < ef <= 1. Probability of choosing exploration over exploitation.
+        self.start_distance = start_distance # If given, every game starts this many moves away from the solved state. Otherwise the start is uniformly random.
+        self.sweeps = sweeps # States to sweep after every move (see 'prioritized_sweeping.py'). 0 - no sweeping.
+        self.sweep_queue_size = sweep_queue_size # Most states waiting to be swept.
+        self.sweep_updates = 0 # Q-values updated by sweeping in the last training.
+        self.curriculum = curriculum # Optional 'ReverseCurriculum' which chooses the starts of the games instead of 'start_distance'.
+        self.generations_used = None # Games played in the last training.
+        self.stop_reason = None # Why the last training stopped early (see 'EarlyStopping'), None if it played all games.
 
-        self.table = None # The resulting state-action map from the trained q-table.
+        self.table = None # The resulting state-action map from the trained q-table (a 'Policy').
 
     @staticmethod
     def _generate_q_table():
         """
-        Generates a dictionary with keys all possible reachable states of the board and values the possible directions you can "move the hole" (up, right, down, left).
-        The keys are numbers derived from the board state. For example if we have the board:
-            3 2 1
-            5 4 6
-            7 0 8
-        the associated key(number) is 321546708.
+        Generates the Q-table - a flat array of 32-bit floats with 4 entries for every reachable state of the board. The entries
+        of the state with index 's' (see 'permutation_rank.rank()') are at 4*s, 4*s+1, 4*s+2, 4*s+3 and hold the values of the
+        possible directions you can "move the hole" in the order up, right, down, left.
 
         The possible actions depend on the position of the hole (represented by 0).
         If we have the hole right in the middle, the actions we can take are 4: "move the hole up/right/down/left".
         If we have the hole at top left corner the actions are 2: "move the hole right/down".
+        The impossible actions are masked with -inf, so they are never the best action.
         """
 
-        # Possible actions according to the position of the hole.
-        possible_actions = {
-            0: { 'r': 0, 'd': 0 },
-            1: { 'r': 0, 'd': 0, 'l': 0 },
-            2: { 'd': 0, 'l': 0 },
-            3: { 'u': 0, 'r': 0, 'd': 0 },
-            4: { 'u': 0, 'r': 0, 'd': 0, 'l': 0 },
-            5: { 'u': 0, 'd': 0, 'l': 0 },
-            6: { 'u': 0, 'r': 0 },
-            7: { 'u': 0, 'r': 0, 'l': 0 },
-            8: { 'u': 0, 'l': 0 }
-        }
-        
-        # Go through each position the hole can be in (9 in total).
-        # Go through all permutations of the other tiles.
-        # Make an entry in the dictionary with the possible actions we can take to move the hole.
-        q_table = {}
+        # The states are grouped by the position of the hole, so all states in a group share the same mask.
+        q_table = array('f')
         for i in range(0, 9):
-            for p in itertools.permutations([1,2,3,4,5,6,7,8]):
-                # Put the hole on the board.
-                board = p[0:i] + (0,) + p[i:8]
-
-                # Discard the unsolvable positions.
-                if SlidingPuzzleGame.count_transpositions(board) % 2 == 1:
-                    continue
-
-                key = QLearning.convert_to_number(board)
-                value = copy.deepcopy(possible_actions[i])
-
-                q_table[key] = value
+            row = [0.0 if a in POSSIBLE_ACTIONS[i] else float('-inf') for a in ACTIONS]
+            q_table.extend(array('f', row) * pr.PERMUTATIONS_PER_HOLE)
 
-        q_table[123456780] = {} # This is the final state. The puzzle is solved so no more actions are needed.
+        # This is the final state. The puzzle is solved so no more actions are needed.
+        final = pr.SOLVED_RANK * 4
+        q_table[final:final + 4] = array('f', [float('-inf')] * 4)
 
         return q_table
 
     @staticmethod
     def convert_to_number(board):
-        result = 0
-        for n in board:
-            result *= 10
-            result += n
-        return result
+        return board_key(board)
 
     @staticmethod
-    def _choose_rand_action(action_dict):
+    def _choose_rand_action(q_table, state, rng=random):
         """
-        Returns a random action and its q-value as a tuple (action, value).
+        Returns a random possible action in the given state and its q-value as a tuple (action, value).
         """
-        action = random.choice(list(action_dict.keys()))
-        return action, action_dict[action]
+        action = rng.choice(POSSIBLE_ACTIONS[pr.hole_index(state)])
+        return action, q_table[state * 4 + ACTIONS.index(action)]
 
     @staticmethod
-    def _find_best_action(action_dict):
+    def _find_best_action(q_table, state):
         """
-        Returns the action with the highest q-value and its q-value as a tuple (action, value).
+        Returns the action with the highest q-value in the given state and its q-value as a tuple (action, value).
         """
+        i = state * 4
         best_action = (None, float('-inf'))
-        for action in action_dict:
-            if action_dict[action] > best_action[1]:
-                best_action = action, action_dict[action]
+        for a in range(0, 4):
+            if q_table[i + a] > best_action[1]:
+                best_action = ACTIONS[a], q_table[i + a]
         return best_action
 
+    @staticmethod
+    def _greedy_moves(q_table, state, max_moves):
+        """
+        Follows the best actions of the Q-table from the state. Returns the number of moves it takes to reach the solved state,
+        or None if it takes more than 'max_moves'.
+        """
+        table = pr.move_table()
+        for moves in range(1, max_moves + 1):
+            state = table[state * 4 + ACTIONS.index(QLearning._find_best_action(q_table, state)[0])]
+            if state == pr.SOLVED_RANK:
+                return moves
+        return None
+
     @staticmethod
     def _get_simple_table(q_table):
         """
@@ -102,93 +112,161 @@ class QLearning:
         The best action is represented as movement of the hole up/right/down/left.
         """
         simple_table = {}
-        for key in q_table:
-            simple_table[key] = QLearning._find_best_action(q_table[key])[0]
+        for state in range(0, pr.STATE_COUNT):
+            key = QLearning.convert_to_number(pr.unrank(state))
+            simple_table[key] = QLearning._find_best_action(q_table, state)[0]
 
         return simple_table
 
-    def train(self):
+    @staticmethod
+    def _get_policy(q_table):
+        """
+        Returns the state-action map of the Q-table as a 'Policy' - the best action of every state packed in 2 bits, in the
+        order of the indexes of the states. Unlike '_get_simple_table()' it doesn't build a dictionary of all boards.
+        """
+        return Policy.from_codes(
+            ACTIONS.index(QLearning._find_best_action(q_table, state)[0]) if state != pr.SOLVED_RANK else 0
+            for state in range(0, pr.STATE_COUNT)
+        )
+
+    def train(self, metrics=None, stopping=None):
+        """
+        Trains the Q-table. 'metrics' is an optional 'TrainingMetrics' object which reports the progress of the training.
+        'stopping' is an optional 'EarlyStopping' object which ends the training before all generations are played.
+        """
         q_table = self._generate_q_table()
-        puzzle = SlidingPuzzleGame()
+        self.sweep_updates = 0
+        self._play_games(q_table, self.generations, metrics=metrics, stopping=stopping)
+        self.table = self._get_policy(q_table)
+
+    def _play_games(self, q_table, generations, rng=random, verbose=True, metrics=None, stopping=None):
+        """
+        Plays 'generations' games (fewer if 'stopping' says so) and updates 'q_table' along the way. Returns the number of
+        moves made. The number of games is in 'generations_used' and the reason for stopping early in 'stop_reason'.
+        'rng' is the source of randomness - the 'random' module or a 'random.Random' object.
+        """
+        moves = pr.move_table() # The games are played on the indexes of the boards, without a puzzle object.
+        sampler = StateSampler(rng)
+        steps = 0
+
+        sweeper = None
+        if self.sweeps > 0:
+            from prioritized_sweeping import PrioritizedSweeping
+            sweeper = PrioritizedSweeping(q_table, self.learning_rate, self.discount_factor, self.sweep_queue_size)
+
+        curriculum = self.curriculum
+        if curriculum is not None:
+            curriculum.start()
+
+        if metrics is not None:
+            metrics.start(q_table, self._find_best_action)
+            visited = metrics.visited
+
+        if stopping is not None:
+            stopping.start(q_table)
+        self.stop_reason = None
 
         # Play the game this many times.
-        for gen in range(1, self.generations + 1):
-            puzzle.shuffle()
-            if puzzle.is_solved(): continue
+        gen = 0
+        for gen in range(1, generations + 1):
+            if curriculum is not None:
+                state = start = curriculum.sample_index()
+            else:
+                state = sampler.sample_index(self.start_distance)
+            game_start = steps
+            is_solved = False
 
             # Reset games longer than given max.
             for _ in range(0, self.max_steps):
-                current_state = q_table[self.convert_to_number(puzzle.board)]
+                if metrics is not None:
+                    visited[state] = 1
 
                 # Choose action - explore or exploit.
-                explore_or_exploit = random.random()
+                explore_or_exploit = rng.random()
                 if explore_or_exploit < self.exploration_probability:
-                    action = self._choose_rand_action(current_state)
+                    action = self._choose_rand_action(q_table, state, rng)
                 else:
-                    action = self._find_best_action(current_state)
+                    action = self._find_best_action(q_table, state)
 
                 # Take action.
-                puzzle.move_hole(action[0])
+                a = ACTIONS.index(action[0])
+                next_state = moves[state * 4 + a]
+                steps += 1
 
                 # Set reward.
-                is_solved = puzzle.is_solved()
+                is_solved = next_state == pr.SOLVED_RANK
                 if is_solved:
                     reward = 1
                     next_best_action_value = 0 # This is the final state. No actions can be taken.
                 else:
                     reward = 0
-                    next_best_action_value = self._find_best_action(q_table[self.convert_to_number(puzzle.board)])[1]
+                    next_best_action_value = self._find_best_action(q_table, next_state)[1]
 
                 # Update Q-table.
-                current_state[action[0]] = (1 - self.learning_rate) * current_state[action[0]] + self.learning_rate * (reward + self.discount_factor * next_best_action_value)
+                i = state * 4 + a
+                if sweeper is not None:
+                    old_value = sweeper.value(state)
+                q_table[i] = (1 - self.learning_rate) * q_table[i] + self.learning_rate * (reward + self.discount_factor * next_best_action_value)
+                if sweeper is not None:
+                    # Let the states leading here learn about the change without playing them.
+                    sweeper.push(state, sweeper.value(state) - old_value)
+                    if is_solved:
+                        sweeper.push(next_state, 1) # Every move into the solved state gives the reward.
+                    sweeper.sweep(self.sweeps)
 
                 # Maybe can do this better and not check 2 times if the puzzle is solved.
                 if is_solved: break
 
-            if gen % 10000 == 0:
+                state = next_state
+
+            if curriculum is not None:
+                curriculum.game_finished(gen, start, q_table)
+
+            if metrics is not None:
+                metrics.game_finished(steps - game_start, is_solved)
+                if gen % metrics.interval == 0:
+                    metrics.report(gen, q_table)
+
+            if verbose and gen % 10000 == 0:
                 print(f'{gen} generations completed.')
-        
-        self.table = self._get_simple_table(q_table)
+
+            if stopping is not None and gen % stopping.interval == 0 and stopping.check(gen, q_table):
+                self.stop_reason = stopping.reason
+                if verbose:
+                    print(f'Stopped after {gen} generations ({stopping.reason}).')
+                break
+
+        self.generations_used = gen
+
+        if sweeper is not None:
+            self.sweep_updates += sweeper.updates
+        return steps
                 
     def test(self):
         """
         Goes through all possible(reachable) board arrangements, checks how many steps each of them takes to solve 
         and returns the arrangement which took the most steps along with the number of steps it took.
+        If the state-action map never solves some arrangements, returns one of them along with infinity.
+        See 'policy_evaluation.evaluate_policy()' for the number of steps of all arrangements.
         """
         if self.table is None:
             raise ValueError('The table is not initialized yet! Train the agent first.')
 
-        hardest_board_state = None
-        most_moves = -1
-        puzzle = SlidingPuzzleGame()
-        for curr_start_board in itertools.permutations([0,1,2,3,4,5,6,7,8]):
-            if SlidingPuzzleGame.count_transpositions(curr_start_board) % 2 == 1: continue
-            
-            puzzle.board = list(curr_start_board)
-
-            # Solve.
-            move_count = 0
-            for i in range(0, 200): # Stop if a game takes more than 200 moves.
-                if puzzle.is_solved(): break
-
-                puzzle.move_hole(self.table[self.convert_to_number(puzzle.board)])
-                move_count += 1
-
-            if move_count > most_moves:
-                most_moves = move_count
-                hardest_board_state = list(curr_start_board)
-        
-        return hardest_board_state, most_moves
+        evaluation = evaluate_policy(self.table)
+        if evaluation.looping:
+            return pr.unrank(evaluation.looping[0]), float('inf')
+
+        return evaluation.hardest_board, evaluation.most_moves
 
     def save(self, file_name):
         """
         Save the state-action map to a file.
-        It is not mandatory but it's best to use the '.pkl' extension because we are saving in this format.
+        If the file name ends with '.bin' the map is saved in the compact binary format (see 'policy_file.py'), otherwise it
+        is pickled - it is not mandatory but it's best to use the '.pkl' extension in this case.
         Raises an exception if the file already exists.
         """
         if self.table is None:
             raise ValueError('The table is not initialized yet! Train the agent first.')
         
-        with open(file_name, 'xb') as f:
-            pickle.dump(self.table, f) # Save the dictionary in binary format.
+        save_table(file_name, self.table)
 
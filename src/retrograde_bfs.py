@@ -0,0 +1,90 @@
+from array import array
+from collections import deque
+
+import permutation_rank as pr
+from policy_file import save_table
+from sliding_puzzle import HOLE_MOVES, OPPOSITE, PackedSlidingPuzzle
+
+UNREACHED = 255 # Distance of a state which is not reached yet.
+
+class RetrogradeBFS:
+    """
+    Finds the optimal state-action map with a breadth-first search backward from the solved state.
+
+    The search visits the states in the order of their distance from 123456780. When a state is reached for the first time
+    from a state at distance 'd', its distance is 'd + 1' and the best action in it is to move the hole back to where it came
+    from. Every state is visited once, so unlike Q-learning the solutions are provably the shortest ones.
+    """
+
+    def __init__(self):
+        self.table = None # The resulting state-action map.
+        self.distances = None # Number of moves to solve each state, indexed by 'permutation_rank.rank()'.
+
+    def train(self):
+        distances = array('B', [UNREACHED]) * pr.STATE_COUNT
+        table = {}
+
+        state = PackedSlidingPuzzle.SOLVED_STATE
+        distances[pr.SOLVED_RANK] = 0
+        table[PackedSlidingPuzzle.SOLVED_KEY] = None # This is the final state. The puzzle is solved so no more actions are needed.
+
+        queue = deque([(state, 8, 0)]) # Packed board, index of the hole, distance.
+        while queue:
+            state, h_i, distance = queue.popleft()
+
+            for direction, t_i in HOLE_MOVES[h_i].items():
+                # Move the hole (see 'PackedSlidingPuzzle._slide()').
+                tile = (state >> 4 * (8 - t_i)) & 0xF
+                next_state = state + (tile << 4 * (8 - h_i)) - (tile << 4 * (8 - t_i))
+
+                r = pr.rank_packed(next_state)
+                if distances[r] != UNREACHED:
+                    continue
+
+                distances[r] = distance + 1
+                # The cells hold the digits 0-8, so the packed board written in hex is the decimal key of the board.
+                table[int(f'{next_state:09x}')] = OPPOSITE[direction]
+                queue.append((next_state, t_i, distance + 1))
+
+        self.table = table
+        self.distances = distances
+
+    def test(self):
+        """
+        Returns the board arrangement which takes the most moves to solve along with the number of moves it takes.
+        """
+        if self.distances is None:
+            raise ValueError('The table is not initialized yet! Train the agent first.')
+
+        most_moves = max(self.distances)
+        return pr.unrank(self.distances.index(most_moves)), most_moves
+
+    def save(self, file_name):
+        """
+        Save the state-action map to a file. See 'QLearning.save()'.
+        """
+        if self.table is None:
+            raise ValueError('The table is not initialized yet! Train the agent first.')
+
+        save_table(file_name, self.table)
+
+    def save_distances(self, file_name):
+        """
+        Save the distance table to a file - 181440 bytes, the byte with index 'permutation_rank.rank(board)' is the least
+        number of moves to solve 'board'. Raises an exception if the file already exists.
+        """
+        if self.distances is None:
+            raise ValueError('The table is not initialized yet! Train the agent first.')
+
+        with open(file_name, 'xb') as f:
+            self.distances.tofile(f)
+
+    @staticmethod
+    def load_distances(file_name):
+        """
+        Load a distance table saved with 'save_distances()'.
+        """
+        distances = array('B')
+        with open(file_name, 'rb') as f:
+            distances.fromfile(f, pr.STATE_COUNT)
+        return distances
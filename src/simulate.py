@@ -0,0 +1,282 @@
+import argparse
+from collections import deque
+import json
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy') # No window - must be set before pygame opens the display.
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+from game import Game
+import game_constants as gc
+from sliding_puzzle import hole_moves
+from start_menu import StartMenu
+
+# Solves a board with the solver sped up, plays some moves, solves the next shuffle at normal speed and goes back.
+DEFAULT_SCRIPT = """
+wait 0.5
+solve
+key up
+key up
+idle
+shuffle
+wait 0.5
+move 20
+solve
+idle
+back
+"""
+
+def parse_script(text):
+    """
+    Returns the actions of a script, one per line. '#' starts a comment.
+        tile I      click the tile in cell I of the board (0 is the top left cell)
+        move [N]    click a random tile next to the hole, N times (default 1), each once no tile is sliding
+        solve, shuffle, back, stop
+                    click the button
+        key NAME    press a key, e.g. 'key up', 'key down' or 'key escape'
+        wait S      do nothing for S seconds
+        idle        wait until no tile is sliding and the solver is done
+    Raises ValueError if a line is not an action.
+    """
+    actions = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        words = line.split('#')[0].split()
+        if not words:
+            continue
+
+        name, args = words[0], words[1:]
+        try:
+            if name == 'tile' and len(args) == 1:
+                actions.append(('tile', int(args[0])))
+            elif name == 'move' and len(args) <= 1:
+                actions.extend([('move', None)] * (int(args[0]) if args else 1))
+            elif name in ('solve', 'shuffle', 'back', 'stop', 'idle') and not args:
+                actions.append((name, None))
+            elif name == 'key' and len(args) == 1:
+                actions.append(('key', pygame.key.key_code(args[0])))
+            elif name == 'wait' and len(args) == 1:
+                actions.append(('wait', float(args[0])))
+            else:
+                raise ValueError('unknown action')
+        except ValueError as e:
+            raise ValueError(f'Line {number} of the script "{line.strip()}": {e}.') from None
+    return actions
+
+_WAKE_UP = pygame.event.custom_type() # Ignored by the game.
+
+def _percentile(values, p):
+    """
+    Returns the 'p'-th percentile (nearest rank) of sorted 'values'.
+    """
+    if not values:
+        return 0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+class HeadlessGame(Game):
+    """
+    Plays a script on the real play screen ('Game._play()') without a window or a mouse and records the time of every frame.
+    The actions of the script are turned into pygame events at the start of a frame, so they go through the same code as
+    clicks of a player.
+    """
+
+    def __init__(self, script, size=3, seed=0, max_seconds=600):
+        super().__init__(start=False, size=size)
+        self.actions = deque(parse_script(script))
+        self.rng = random.Random(seed)
+        random.seed(seed) # The shuffles of the puzzle.
+        self.max_seconds = max_seconds
+        self.moves = hole_moves(size)
+
+        self.frame_times = [] # Seconds between the starts of two frames.
+        self.work_times = [] # Seconds the game worked on a frame, without waiting for the clock.
+        self._frame_start = None
+        self._wait_until = 0
+        self.wait_seconds = 0 # Time spent in 'wait' actions.
+        self.wait_cpu_seconds = 0 # CPU time used by the process during 'wait' actions.
+        self.wait_frames = 0 # Frames (times the play loop woke up) during 'wait' actions.
+        self._wait_start = None
+        self._buttons = { name: button for name, button in zip(('back', 'shuffle', 'solve', 'stop'), self._create_playscreen_buttons()) }
+
+    def run(self):
+        """
+        Plays the script and returns the report (see 'report()').
+        """
+        self._wait_for_puzzle_pieces()
+        self.solver # Loaded before the first frame, like after the start menu.
+        self._start_time = time.perf_counter()
+        self._play()
+        return self.report()
+
+    def _next_frame(self, clock, idle):
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.work_times.append(now - self._frame_start)
+        if now - self._start_time > self.max_seconds:
+            raise TimeoutError(f'The script did not finish in {self.max_seconds} s.')
+
+        if self._wait_start is not None:
+            self.wait_frames += 1
+
+        # Posted before the wait, so an idle game wakes up for them.
+        self._play_script(now)
+        events = super()._next_frame(clock, idle)
+
+        start = time.perf_counter()
+        if self._frame_start is not None and not idle:
+            self.frame_times.append(start - self._frame_start) # An idle game waits as long as it likes.
+        self._frame_start = start
+        return events
+
+    @property
+    def idle(self):
+        """True if no tile is sliding and the solver is not running."""
+        return not self.animator.busy and self._solve_future is None
+
+    def _click(self, pos):
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1))
+
+    def _cell_center(self, i):
+        row, col = divmod(i, self.size)
+        return (
+            gc.BORDER_WIDTH + col * self.tile_size + self.tile_size // 2,
+            gc.BORDER_WIDTH + row * self.tile_size + self.tile_size // 2
+        )
+
+    def _play_script(self, now):
+        """
+        Posts the events of the actions which are due. Clicks on the board wait until the tiles have stopped, like a player
+        who looks before clicking; everything else is posted right away. Goes back to the start menu when the script ends.
+        """
+        while True:
+            if now < self._wait_until:
+                return
+            if self._wait_start is not None:
+                self.wait_seconds += now - self._wait_start[0]
+                self.wait_cpu_seconds += time.process_time() - self._wait_start[1]
+                self._wait_start = None
+            if not self.actions:
+                if self.idle:
+                    self._click(self._buttons['back'].btn.center)
+                return
+
+            name, arg = self.actions[0]
+            if name in ('idle', 'tile', 'move') and not self.idle:
+                return
+            self.actions.popleft()
+
+            if name == 'wait':
+                self._wait_until = now + arg
+                self._wait_start = (now, time.process_time())
+                # Wakes up an idle game when the wait is over.
+                pygame.time.set_timer(_WAKE_UP, math.ceil(arg * 1000) + 1, loops=1)
+            elif name == 'tile':
+                self._click(self._cell_center(arg))
+                return # One click per frame, so the next action sees the tile sliding.
+            elif name == 'move':
+                hole = self.puzzle.board.index(0)
+                self._click(self._cell_center(self.rng.choice(list(self.moves[hole].values()))))
+                return
+            elif name == 'key':
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=arg))
+            elif name in self._buttons:
+                self._click(self._buttons[name].btn.center)
+                if name == 'back':
+                    self.actions.clear()
+                return
+
+    def report(self):
+        """
+        Returns the number of frames, the seconds the script took, the 50th/95th/99th percentile and the longest frame time
+        and work time (in ms), and the dropped frames - the frames which the clock should have started but couldn't, because
+        a frame took longer than 1 / FPS. The frame times leave out the frames in which the game was idle and waited for input.
+        """
+        budget = 1 / gc.FPS
+        result = {
+            'frames': len(self.work_times),
+            'seconds': time.perf_counter() - self._start_time,
+            'dropped_frames': sum(max(0, round(t / budget) - 1) for t in self.frame_times)
+        }
+        for name, values in (('frame_time', self.frame_times), ('work_time', self.work_times)):
+            values = sorted(values)
+            result[name] = { f'p{p}': _percentile(values, p) * 1000 for p in (50, 95, 99) }
+            result[name]['max'] = values[-1] * 1000 if values else 0
+        return result
+
+def simulate(script=DEFAULT_SCRIPT, size=3, seed=0):
+    """
+    Plays 'script' (see 'parse_script()') on a headless game and returns the report.
+    """
+    game = HeadlessGame(script, size=size, seed=seed)
+    try:
+        return game.run()
+    finally:
+        game.close()
+
+def measure_idle_cpu(seconds=60, size=3):
+    """
+    Leaves the start menu and a shuffled board alone for 'seconds' each and returns the CPU seconds the process used per
+    minute on each, and the number of frames the board drew per minute.
+    Note that SDL's dummy video driver polls for events while it waits, so the CPU time shown with it is higher than with a
+    real window.
+    """
+    game = HeadlessGame(f'wait {seconds}', size=size)
+    try:
+        game._wait_for_puzzle_pieces()
+        game.solver
+
+        pygame.time.set_timer(pygame.QUIT, round(seconds * 1000), loops=1) # Closes the menu.
+        start, cpu_start = time.perf_counter(), time.process_time()
+        StartMenu(game.screen).draw()
+        menu = (time.process_time() - cpu_start) / (time.perf_counter() - start) * 60
+
+        game.run()
+        board = game.wait_cpu_seconds / game.wait_seconds * 60
+        frames = game.wait_frames / game.wait_seconds * 60
+    finally:
+        game.close()
+
+    return {
+        'menu_cpu_seconds_per_minute': menu,
+        'board_cpu_seconds_per_minute': board,
+        'board_frames_per_minute': frames
+    }
+
+if __name__ == '__main__':
+    """
+    Plays a script of clicks and key presses on the play screen without a window (SDL's dummy video driver) and prints the
+    frame times as JSON. The real game code runs, only the input is scripted, so this can run on a machine without a display.
+    Example:
+        python simulate.py --script my_script.txt
+        python simulate.py --size 4
+    """
+
+    parser = argparse.ArgumentParser(description='Play a scripted game without a window and measure the frame times.')
+    parser.add_argument('--script', help='file with the actions to play (default: a short built-in script)')
+    parser.add_argument('--size', type=int, choices=[3, 4], default=3, help='3 for the 8-puzzle, 4 for the 15-puzzle')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the shuffles and random moves')
+    parser.add_argument('--idle', type=float, metavar='SECONDS', help='measure the CPU time of the idle start menu and board instead')
+    args = parser.parse_args()
+
+    if args.idle is not None:
+        print(json.dumps(measure_idle_cpu(args.idle, args.size), indent=2))
+        sys.exit()
+
+    script = DEFAULT_SCRIPT
+    if args.script:
+        with open(args.script) as f:
+            script = f.read()
+
+    pygame.init()
+    try:
+        parse_script(script) # Report a bad script before the game starts.
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(json.dumps(simulate(script, args.size, args.seed), indent=2))
@@ -1,9 +1,11 @@
+from collections.abc import Sequence
 import random
 
 class SlidingPuzzleGame:
-    def __init__(self):
+    def __init__(self, size=3):
+        self.size = size # Number of rows and columns - 3 for the 8-puzzle, 4 for the 15-puzzle.
         # 0 is the empty spot.
-        self.board = [1,2,3,4,5,6,7,8,0]
+        self.board = list(range(1, size * size)) + [0]
     
     @staticmethod
     def count_transpositions(board):
@@ -14,21 +16,23 @@ class SlidingPuzzleGame:
 
         # There might be a faster way to count the transpositions
         count = 0
-        for i in range(0, 8):
-            for j in range(i + 1, 9):
+        n = len(board)
+        for i in range(0, n - 1):
+            for j in range(i + 1, n):
                 if board[j] == 0: continue
 
                 if board[i] > board[j]:
                     count += 1
         return count
 
-    def shuffle(self):
+    def shuffle(self, rng=random):
         """
         Shuffles the tiles on the board. Always leaves the board in a solvable state, meaning that the tiles can be rearranged to
             1 2 3
             4 5 6
             7 8
         only by sliding the tiles. The above is considered the solved state.   
+        'rng' is the source of randomness - the 'random' module or a 'random.Random' object.
         """
 
         """
@@ -66,12 +70,44 @@ class SlidingPuzzleGame:
                 In our example the transpositions are: (3,2) (4,2) (7,5) (7,6) (8,6) - 5 in total, so NOT reducible to 123|456|78.
         
         In our shuffling algorithm we can just generate a random arrangement. If the permutation is even then we return the 
-        shuffled board. It it's odd we shuffle again until we end up with even permutation.
+        shuffled board. It it's odd we swap the first two tiles, which makes it even (see '_make_solvable()'). Every even
+        permutation comes from exactly one even and one odd arrangement, so all solvable boards are equally likely and we
+        never have to shuffle again - unless we end up in the solved state.
+
+        On the 4x4 board a vertical move passes the tile over 3 others, which changes the transposition count by an odd
+        number, and moves the hole to the next row. So there a board is solvable if the transposition count plus the number
+        of rows between the hole and the bottom row is even. The swap works the same way.
         """
         
-        random.shuffle(self.board)
-        while self.count_transpositions(self.board) % 2 == 1 or self.is_solved():
-            random.shuffle(self.board)
+        rng.shuffle(self.board)
+        self._make_solvable(self.board, self.size)
+        while self.is_solved():
+            rng.shuffle(self.board)
+            self._make_solvable(self.board, self.size)
+
+    def is_solvable(self):
+        return self.is_board_solvable(self.board, self.size)
+
+    @staticmethod
+    def is_board_solvable(board, size=3):
+        """
+        Returns true if 'board' can be solved by sliding the tiles. See 'shuffle()'.
+        """
+        transpositions = SlidingPuzzleGame.count_transpositions(board)
+        if size % 2 == 1:
+            return transpositions % 2 == 0
+        return (transpositions + size - 1 - board.index(0) // size) % 2 == 0
+
+    @staticmethod
+    def _make_solvable(board, size=3):
+        """
+        Swaps the first two tiles (skipping the hole) if the board is not solvable.
+        Swapping two tiles changes the transposition count by an odd number, so the board becomes solvable.
+        """
+        if not SlidingPuzzleGame.is_board_solvable(board, size):
+            i = 1 if board[0] == 0 else 0
+            j = i + 2 if board[i + 1] == 0 else i + 1
+            board[i], board[j] = board[j], board[i]
 
     def is_solved(self):
         """
@@ -80,7 +116,7 @@ class SlidingPuzzleGame:
             4 5 6
             7 8 
         """
-        for i in range(0, 8):
+        for i in range(0, self.size * self.size - 1):
             if self.board[i] != i + 1:
                 return False
         return True
@@ -93,10 +129,10 @@ class SlidingPuzzleGame:
         Throws an error for invalid row or col.
         """
 
-        if row < 0 or 2 < row or col < 0 or 2 < col:
-            raise ValueError(f'Invalid row or column! They must be 0, 1 or 2. Given: row = {row}, col = {col}.')
+        if row < 0 or self.size <= row or col < 0 or self.size <= col:
+            raise ValueError(f'Invalid row or column! They must be 0 to {self.size - 1}. Given: row = {row}, col = {col}.')
 
-        return self.move_tile_by_index(row * 3 + col)
+        return self.move_tile_by_index(row * self.size + col)
         
     def move_tile_by_index(self, i):
         """
@@ -105,13 +141,14 @@ class SlidingPuzzleGame:
         Throws an error if index is out of bounds. 
         """
 
-        if i < 0 or 8 < i:
-            raise ValueError(f'Tile index must be 0 <= index <= 8. Given {i}.')
+        size = self.size
+        if i < 0 or size * size <= i:
+            raise ValueError(f'Tile index must be 0 <= index <= {size * size - 1}. Given {i}.')
         
         h_i = self.board.index(0) # Index of the hole.
         
         # Check if the hole is up, right, down or left of the tile.
-        if h_i == i - 3 or (h_i == i + 1 and i % 3 != 2) or h_i == i + 3 or (h_i == i - 1 and i % 3 != 0):
+        if h_i == i - size or (h_i == i + 1 and i % size != size - 1) or h_i == i + size or (h_i == i - 1 and i % size != 0):
             self.board[h_i], self.board[i] = self.board[i], 0
             return h_i
         
@@ -130,27 +167,28 @@ class SlidingPuzzleGame:
         """
 
         h_i = self.board.index(0) # Index of the hole.
+        size = self.size
 
         if direction == 'u':
-            t_i = h_i - 3
+            t_i = h_i - size
             if 0 <= t_i:
                 self.board[h_i], self.board[t_i] = self.board[t_i], 0
             else:
                 raise ValueError(f'Hole cannot be moved up. It is in position {h_i}.')
         elif direction == 'r':
-            if h_i % 3 != 2:
+            if h_i % size != size - 1:
                 t_i = h_i + 1
                 self.board[h_i], self.board[t_i] = self.board[t_i], 0
             else:
                 raise ValueError(f'Hole cannot be moved right. It is in position {h_i}.')
         elif direction == 'd':
-            t_i = h_i + 3
-            if t_i <= 8:
+            t_i = h_i + size
+            if t_i < size * size:
                 self.board[h_i], self.board[t_i] = self.board[t_i], 0
             else:
                 raise ValueError(f'Hole cannot be moved down. It is in position {h_i}.')
         elif direction == 'l':
-            if h_i % 3 != 0:
+            if h_i % size != 0:
                 t_i = h_i - 1
                 self.board[h_i], self.board[t_i] = self.board[t_i], 0
             else:
@@ -158,4 +196,186 @@ class SlidingPuzzleGame:
         else:
             raise ValueError(f'Invalid direction for moving the hole! Valid directions are u/r/d/l. Given {direction}.')
         
-        return t_i, h_i
\ No newline at end of file
+        return t_i, h_i
+
+# Bit offset of each board cell in the packed state. The cells are packed row by row, 4 bits each, with index 0 in the most
+# significant nibble, so the solved board [1,2,3,4,5,6,7,8,0] is packed as 0x123456780.
+_SHIFTS = tuple(4 * (8 - i) for i in range(0, 9))
+
+def board_key(board):
+    """
+    Returns the numbers on the board read as one decimal number, e.g. 123456780 for the solved 8-puzzle.
+    The keys of the pickled state-action map.
+    """
+    result = 0
+    for n in board:
+        result *= 10
+        result += n
+    return result
+
+def hole_moves(size):
+    """
+    For every position of the hole on a 'size' x 'size' board, returns the index of the tile which swaps places with the hole
+    when the hole is moved u/r/d/l. Impossible moves are left out.
+    """
+    return tuple(
+        {
+            d: t_i for d, t_i in (('u', h_i - size), ('r', h_i + 1), ('d', h_i + size), ('l', h_i - 1))
+            if 0 <= t_i < size * size and (d not in 'rl' or t_i // size == h_i // size)
+        }
+        for h_i in range(0, size * size)
+    )
+
+HOLE_MOVES = hole_moves(3)
+# Direction which undoes a movement of the hole.
+OPPOSITE = { 'u': 'd', 'r': 'l', 'd': 'u', 'l': 'r' }
+# For every position of the hole, the indexes of the tiles which can slide into it.
+_NEIGHBOURS = tuple(frozenset(moves.values()) for moves in HOLE_MOVES)
+# For every position of the hole and direction, the index of the tile which slides into the hole, its bit offset in the
+# packed state and how much the packed state changes per unit of the tile (see 'PackedSlidingPuzzle._slide()').
+_MOVES = tuple(
+    { d: (t_i, _SHIFTS[t_i], (1 << _SHIFTS[h_i]) - (1 << _SHIFTS[t_i])) for d, t_i in moves.items() }
+    for h_i, moves in enumerate(HOLE_MOVES)
+)
+
+
+class _BoardView(Sequence):
+    """
+    Read-only list-like view of the board of a 'PackedSlidingPuzzle'.
+    Decodes the cells from the packed state on access, so it never goes out of date.
+    """
+
+    __slots__ = ('_puzzle',)
+
+    def __init__(self, puzzle):
+        self._puzzle = puzzle
+
+    def __len__(self):
+        return 9
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(9))]
+        if i < 0:
+            i += 9
+        if i < 0 or 8 < i:
+            raise IndexError(f'Tile index must be 0 <= index <= 8. Given {i}.')
+        return (self._puzzle.state >> _SHIFTS[i]) & 0xF
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class PackedSlidingPuzzle(SlidingPuzzleGame):
+    """
+    Same puzzle logic as 'SlidingPuzzleGame' but the board is stored as a single integer with 4 bits per cell.
+    The index of the hole is kept up to date on every move, so moving a tile and checking if the puzzle is solved take
+    constant time. The decimal key of the board (as given by 'board_key()') is only made when 'key' is read. Whether the
+    board is solvable is found once when the board is set - a move of a tile on the 3x3 board never changes the parity of
+    the transposition count (see 'SlidingPuzzleGame.is_board_solvable()'), so moves don't have to keep track of it.
+
+    'board' is a read-only view of the packed state. Assign a new list to 'board' to set up an arbitrary arrangement.
+    """
+
+    SOLVED_STATE = 0x123456780
+    SOLVED_KEY = 123456780
+
+    def __init__(self):
+        # Do not call the base constructor - it assigns a list to 'self.board'.
+        self.state = self.SOLVED_STATE
+        self.size = 3
+        self.hole = 8 # Index of the hole.
+        self._solvable = True
+        self._view = _BoardView(self)
+
+    @property
+    def board(self):
+        return self._view
+
+    @board.setter
+    def board(self, board):
+        self._set_board(board, self.count_transpositions(board) % 2 == 0)
+
+    def _set_board(self, board, solvable):
+        state = 0
+        for n in board:
+            state = (state << 4) | n
+
+        self.state = state
+        self.hole = board.index(0)
+        self._solvable = solvable
+
+    @property
+    def key(self):
+        """
+        The decimal key of the board. The cells hold the digits 0-8, so the packed board written in hex is the key.
+        """
+        return int(f'{self.state:09x}')
+
+    def is_solvable(self):
+        return self._solvable
+
+    def shuffle(self, rng=random):
+        """
+        Shuffles the tiles on the board. See 'SlidingPuzzleGame.shuffle()'.
+        """
+        state = self.state
+        board = [(state >> shift) & 0xF for shift in _SHIFTS]
+        rng.shuffle(board)
+        self._make_solvable(board)
+        while board == [1,2,3,4,5,6,7,8,0]:
+            rng.shuffle(board)
+            self._make_solvable(board)
+
+        self._set_board(board, True)
+
+    def is_solved(self):
+        return self.state == self.SOLVED_STATE
+
+    def _slide(self, t_i):
+        """
+        Slides the tile in position 't_i' into the hole. Expects 't_i' to be adjacent to the hole.
+        """
+        h_i = self.hole
+        state = self.state
+        tile = (state >> _SHIFTS[t_i]) & 0xF
+
+        # The hole is 0 so we only have to add the tile to its new cell and take it out of its old cell.
+        self.state = state + (tile << _SHIFTS[h_i]) - (tile << _SHIFTS[t_i])
+        self.hole = t_i
+
+    def move_tile_by_index(self, i):
+        """
+        See 'SlidingPuzzleGame.move_tile_by_index()'.
+        """
+        if i < 0 or 8 < i:
+            raise ValueError(f'Tile index must be 0 <= index <= 8. Given {i}.')
+
+        h_i = self.hole
+        if i in _NEIGHBOURS[h_i]:
+            self._slide(i)
+            return h_i
+
+        return None
+
+    def move_hole(self, direction):
+        """
+        See 'SlidingPuzzleGame.move_hole()'.
+        """
+        h_i = self.hole
+        move = _MOVES[h_i].get(direction)
+        if move is None:
+            if direction not in ('u', 'r', 'd', 'l'):
+                raise ValueError(f'Invalid direction for moving the hole! Valid directions are u/r/d/l. Given {direction}.')
+            names = { 'u': 'up', 'r': 'right', 'd': 'down', 'l': 'left' }
+            raise ValueError(f'Hole cannot be moved {names[direction]}. It is in position {h_i}.')
+
+        # Same as '_slide(t_i)' with the shifts worked out in advance.
+        t_i, shift, delta = move
+        state = self.state
+        self.state = state + ((state >> shift) & 0xF) * delta
+        self.hole = t_i
+        return t_i, h_i
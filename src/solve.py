@@ -0,0 +1,203 @@
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+
+import game_constants as gc
+from sliding_puzzle import SlidingPuzzleGame
+
+# Solvers of the process, by board size. Loaded when the first board of a size comes in (see '_get_solver()').
+_solvers = {}
+_paths = {}
+
+def _init_solvers(policy_path, pattern_databases_path):
+    """
+    Remembers where the solvers are loaded from. Runs once in every worker process, so each worker loads them only once.
+    """
+    _solvers.clear()
+    _paths[3] = policy_path
+    _paths[4] = pattern_databases_path
+
+def _get_solver(size):
+    if size not in _solvers:
+        if size == 3:
+            from solver import Solver
+            _solvers[3] = Solver(_paths[3])
+        else:
+            from ida_star import IDAStarSolver
+            from pattern_database import load_pattern_databases
+            _solvers[4] = IDAStarSolver(load_pattern_databases(_paths[4], build=False))
+    return _solvers[size]
+
+def read_boards(lines, input_format):
+    """
+    Yields a record for every non-empty line of 'lines' (e.g. a file or 'sys.stdin'). One line is read at a time.
+
+    'jsonl' - every line is a JSON list of the numbers on the board, e.g. [1,2,3,4,5,6,7,0,8], or an object with the list under
+    "board" and optionally an "id" which is copied to the result.
+    'csv' - every row holds the numbers on the board. A first non-empty row which is not all numbers is taken as the header and
+    skipped.
+
+    A record is a dictionary with "line" (the line number), "board" and "id" if given, or "error" if the line can't be read.
+    """
+    first_row = True
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        is_first_row, first_row = first_row, False
+
+        record = { 'line': number }
+        try:
+            if input_format == 'csv':
+                row = next(csv.reader([line]))
+                try:
+                    record['board'] = [int(n) for n in row]
+                except ValueError:
+                    if is_first_row:
+                        continue # Header.
+                    raise
+            else:
+                value = json.loads(line)
+                if isinstance(value, dict):
+                    if 'id' in value:
+                        record['id'] = value['id']
+                    value = value['board']
+                record['board'] = [int(n) for n in value]
+        except (ValueError, KeyError, TypeError) as e:
+            record['error'] = f'Cannot read the board: {e}'
+        yield record
+
+def solve_board(record):
+    """
+    Checks and solves the board of a record. Adds "solvable" and, if it is solvable, the moves of the hole "moves" (a string
+    of u/r/d/l) and their number "length". Adds "error" instead if the board is not valid or can't be solved.
+    """
+    if 'error' in record:
+        return record
+
+    board = record['board']
+    size = {9: 3, 16: 4}.get(len(board))
+    if size is None or sorted(board) != list(range(0, len(board))):
+        record['error'] = 'A board must hold the numbers 0 to 8 or 0 to 15.'
+        return record
+
+    record['solvable'] = SlidingPuzzleGame.is_board_solvable(board, size)
+    if not record['solvable']:
+        return record
+
+    try:
+        solver = _get_solver(size)
+    except (OSError, ValueError) as e:
+        # The file is missing or can't be read (OSError), or it is truncated or damaged (ValueError).
+        record['error'] = f'No solver for {size}x{size} boards: {e}'
+        return record
+
+    try:
+        moves = solver.solve_path(board)
+    except ValueError as e:
+        record['error'] = str(e) # The state-action map goes around in a cycle.
+        return record
+
+    record['moves'] = ''.join(moves)
+    record['length'] = len(moves)
+    return record
+
+def _solve_chunk(records):
+    return [solve_board(record) for record in records]
+
+def solve_stream(records, workers=1, chunk_size=256):
+    """
+    Solves the records (see 'read_boards()') and yields the results in the same order.
+
+    With more than one worker the records are sent to a process pool in chunks of 'chunk_size'. At most two chunks per
+    worker are read ahead, so the memory used doesn't grow with the number of boards.
+    The solvers must be set up with '_init_solvers()' first; the workers set them up themselves.
+    """
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+    if workers == 1:
+        for chunk in chunks:
+            yield from _solve_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_solvers, initargs=(_paths[3], _paths[4])) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_solve_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+CSV_FIELDS = ['line', 'id', 'solvable', 'length', 'moves', 'error']
+
+if __name__ == '__main__':
+    """
+    Solves many boards without the game window. The boards are read from a file or from the standard input one line at a time
+    and the results are written as soon as they are ready, so any number of boards can be solved with little memory.
+    8-puzzle boards are solved with the state-action map, 15-puzzle boards with 'IDAStarSolver' (the pattern databases must be
+    built first, see 'pattern_database.py').
+    Prints the number of boards and the boards per second to the standard error when done.
+    Example:
+        python solve.py boards.jsonl --workers 4 --output solutions.jsonl
+        echo [1,2,3,4,5,6,0,7,8] | python solve.py
+    """
+
+    parser = argparse.ArgumentParser(description='Solve boards read from a JSONL or CSV file.')
+    parser.add_argument('input', nargs='?', help='file with the boards (default: standard input)')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help='format of the input (default: from the file extension, otherwise jsonl)')
+    parser.add_argument('--output', help='file to write the results to (default: standard output)')
+    parser.add_argument('--output-format', choices=['jsonl', 'csv'], default='jsonl', help='format of the results (default jsonl)')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes, 0 for one per core (default 1)')
+    parser.add_argument('--chunk-size', type=int, default=256, help='boards sent to a worker at once (default 256)')
+    parser.add_argument('--policy', default=gc.STATE_ACTION_MAP_PATH, help='state-action map of the 8-puzzle')
+    parser.add_argument('--pattern-databases', default=gc.PATTERN_DATABASES_PATH, help='pattern database folder of the 15-puzzle')
+    args = parser.parse_args()
+
+    input_format = args.format
+    if input_format is None:
+        input_format = 'csv' if args.input and args.input.endswith('.csv') else 'jsonl'
+
+    _init_solvers(args.policy, args.pattern_databases)
+
+    source = open(args.input, newline='') if args.input else sys.stdin
+    destination = open(args.output, 'w', newline='') if args.output else sys.stdout
+    counts = { 'boards': 0, 'solved': 0, 'unsolvable': 0, 'errors': 0 }
+    start = time.perf_counter()
+    try:
+        writer = None
+        if args.output_format == 'csv':
+            writer = csv.DictWriter(destination, CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+
+        results = solve_stream(read_boards(source, input_format), args.workers or os.cpu_count(), args.chunk_size)
+        for result in results:
+            counts['boards'] += 1
+            if 'error' in result:
+                counts['errors'] += 1
+            elif result['solvable']:
+                counts['solved'] += 1
+            else:
+                counts['unsolvable'] += 1
+
+            if writer is not None:
+                writer.writerow(result)
+            else:
+                destination.write(json.dumps(result) + '\n')
+    finally:
+        if args.input:
+            source.close()
+        if args.output:
+            destination.close()
+
+    seconds = time.perf_counter() - start
+    print(
+        f'{counts["boards"]} boards ({counts["solved"]} solved, {counts["unsolvable"]} not solvable, {counts["errors"]} errors) '
+        f'in {seconds:.2f} s - {counts["boards"] / max(seconds, 1e-9):.0f} boards/s',
+        file=sys.stderr
+    )
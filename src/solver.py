@@ -1,18 +1,43 @@
-import pickle
+from collections import OrderedDict
 
-from q_learning import QLearning as ql
+import permutation_rank as pr
+from policy_file import PolicyFile, is_policy_file
+from sliding_puzzle import PackedSlidingPuzzle, board_key
 
 class Solver:
-    def __init__(self, file_name):
+    def __init__(self, file_name, cache_size=100000):
         self.table = self._load(file_name)
 
+        # Index of a board (see 'permutation_rank.rank()') -> the rest of its solution as a linked list (action, rest), with
+        # rest None after the last action. The boards along a solution share the ends of their solutions, so every board
+        # adds one pair. The least recently used boards are dropped when there are more than 'cache_size'.
+        self.cache_size = cache_size
+        self._suffixes = OrderedDict()
+        self.cache_hits = 0 # Number of 'solve_path()' calls which found a board of their path in the cache.
+        self.cache_misses = 0
+
     @staticmethod
     def _load(file_name):
         """
         Load a state-action map from file.
+        Files in the binary format (see 'policy_file.py') are mapped into memory; all others are unpickled.
+        Raises OSError if the file can't be read and ValueError if it is not a state-action map.
         """
+        if is_policy_file(file_name):
+            return PolicyFile(file_name)
+
+        import pickle # Only needed for the old format.
         with open(file_name, 'rb') as f:
-            return pickle.load(f)
+            try:
+                table = pickle.load(f)
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, KeyError, TypeError,
+                    OverflowError, MemoryError) as e:
+                # A truncated or damaged pickle can fail in any of these ways - a damaged length can even ask for too much memory.
+                raise ValueError(f'{file_name} is not a state-action map ({type(e).__name__}: {e}).') from e
+
+        if not isinstance(table, dict):
+            raise ValueError(f'{file_name} is not a state-action map. It holds a {type(table).__name__}.')
+        return table
         
     def get_action(self, puzzle):
         """
@@ -21,5 +46,63 @@ class Solver:
         """
         if puzzle.is_solved():
             return None
+        elif isinstance(self.table, PolicyFile):
+            return self.table.action(pr.rank(puzzle.board))
+        else:
+            return self.table[board_key(puzzle.board)]
+
+    def solve_path(self, board, cancelled=None):
+        """
+        Returns the list of actions (u/r/d/l) which solve the board according to the state-action map.
+        The map is followed until the puzzle is solved or a board with a known solution is reached; the solutions of all
+        boards along the way are then remembered. Throws ValueError if the map goes around in a cycle, has no move for a board
+        or gives a move which can't be made.
+        'cancelled' is there for the same interface as 'IDAStarSolver.solve_path()' - following the map takes microseconds,
+        so it is never checked.
+        """
+        puzzle = PackedSlidingPuzzle()
+        puzzle.board = list(board)
+        if not puzzle.is_solvable():
+            raise ValueError(f'The board {list(board)} cannot be solved.')
+
+        suffixes = self._suffixes
+        r = pr.rank_packed(puzzle.state)
+        path = [] # Indexes of the boards without known solutions and the actions taken in them.
+        on_path = set()
+        rest = None
+        while not puzzle.is_solved():
+            if r in suffixes:
+                suffixes.move_to_end(r)
+                rest = suffixes[r]
+                break
+            if r in on_path:
+                raise ValueError(f'The state-action map goes around in a cycle from {list(board)}.')
+            on_path.add(r)
+
+            if isinstance(self.table, PolicyFile):
+                action = self.table.action(r)
+            else:
+                action = self.table.get(puzzle.key)
+                if action is None:
+                    raise ValueError(f'The state-action map has no move for the board {list(puzzle.board)}.')
+            tile_index, hole_index = puzzle.move_hole(action)
+            path.append((r, action))
+            r = pr.rank_after_move(r, puzzle.state, tile_index, hole_index)
+
+        if rest is not None:
+            self.cache_hits += 1
         else:
-            return self.table[ql.convert_to_number(puzzle.board)]
\ No newline at end of file
+            self.cache_misses += 1
+
+        # Build the solutions from the end, sharing the rest of the path.
+        for r, action in reversed(path):
+            rest = (action, rest)
+            suffixes[r] = rest
+        while len(suffixes) > self.cache_size:
+            suffixes.popitem(last=False)
+
+        actions = []
+        while rest is not None:
+            action, rest = rest
+            actions.append(action)
+        return actions
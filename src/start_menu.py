@@ -2,6 +2,7 @@ import pygame
 
 from button import Button
 import game_constants as gc
+import text_cache
 
 class StartMenu:
 
@@ -13,7 +14,7 @@ class StartMenu:
         Returns the rectangles of the buttons.
         """
 
-        font = pygame.font.Font(None, gc.START_MENU_BTNS_FONT_SIZE)
+        font = text_cache.get_font(gc.START_MENU_BTNS_FONT_SIZE)
         btn_spacing = 44
 
         play_btn = Button(
@@ -51,11 +52,10 @@ class StartMenu:
 
         # Get input from user (wait for them to click on a button).
         mouse_down_inside_button = { 'play': False, 'quit': False } # Keep track of click and release inside the button.
-        clock = pygame.time.Clock()
 
         while True:
-            clock.tick(gc.FPS)
-            for event in pygame.event.get():
+            # Nothing moves on the start menu, so sleep until there is input instead of drawing frames.
+            for event in [pygame.event.wait()] + pygame.event.get():
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if play_btn.check_btn_press(event.pos):
                         mouse_down_inside_button['play'] = True
@@ -0,0 +1,90 @@
+from array import array
+import random
+
+import permutation_rank as pr
+
+_default_buckets = None # Buckets made from a freshly computed distance table, shared by all samplers of this process.
+
+def _make_buckets(distances):
+    buckets = []
+    for r, d in enumerate(distances):
+        while len(buckets) <= d:
+            buckets.append(array('l'))
+        buckets[d].append(r)
+    return buckets
+
+class StateSampler:
+    """
+    Draws random solvable boards without rejecting any draws.
+
+    A uniformly random board is found by picking a random index (see 'permutation_rank.py') and turning it into a board.
+    A board which takes exactly 'distance' moves to solve is found by picking a random index from the list of all boards at
+    that distance. The lists are made from the distance table of 'RetrogradeBFS' the first time they are needed.
+    The solved board is never returned.
+    """
+
+    def __init__(self, rng=random, distances=None):
+        """
+        'rng' is the source of randomness - the 'random' module or a 'random.Random' object.
+        'distances' is an optional distance table (see 'RetrogradeBFS.distances'). If not given, it is computed when needed,
+        which takes a few seconds, and is then shared by all samplers in the process.
+        """
+        self.rng = rng
+        self._distances = distances
+        self._buckets = None # The indexes of the boards grouped by distance.
+
+    def _get_buckets(self):
+        global _default_buckets
+
+        if self._buckets is None:
+            if self._distances is not None:
+                self._buckets = _make_buckets(self._distances)
+            else:
+                if _default_buckets is None:
+                    from retrograde_bfs import RetrogradeBFS
+                    bfs = RetrogradeBFS()
+                    bfs.train()
+                    _default_buckets = _make_buckets(bfs.distances)
+                self._buckets = _default_buckets
+
+        return self._buckets
+
+    @property
+    def max_distance(self):
+        """
+        The most moves any board takes to solve (31).
+        """
+        return len(self._get_buckets()) - 1
+
+    def sample_index(self, distance=None):
+        """
+        Returns the index of a random solvable board. If 'distance' is given, the board takes exactly that many moves to solve.
+        """
+        if distance is None:
+            r = self.rng.randrange(0, pr.STATE_COUNT - 1)
+            return r + 1 if r >= pr.SOLVED_RANK else r # Skip the solved board.
+
+        bucket = self.indexes_at(distance)
+        return bucket[self.rng.randrange(0, len(bucket))]
+
+    def indexes_at(self, distance):
+        """
+        Returns the indexes of all boards which take exactly 'distance' moves to solve.
+        """
+        buckets = self._get_buckets()
+        if distance < 1 or len(buckets) <= distance:
+            raise ValueError(f'Distance must be 1 <= distance <= {len(buckets) - 1}. Given {distance}.')
+
+        return buckets[distance]
+
+    def sample(self, distance=None):
+        """
+        Returns a random solvable board (a list of the numbers 0 to 8). See 'sample_index()'.
+        """
+        return pr.unrank(self.sample_index(distance))
+
+    def sample_batch(self, n, distance=None):
+        """
+        Returns a list of 'n' random solvable boards. See 'sample_index()'.
+        """
+        return [pr.unrank(self.sample_index(distance)) for _ in range(0, n)]
@@ -0,0 +1,63 @@
+"""
+Fonts and rendered text shared by the whole game, so text is rasterized once instead of on every draw.
+
+Fonts are loaded once per file and size ('get_font()'), text is rendered once per font, string and color ('render()'), and
+numbers are put together from the rendered digits 0-9 ('draw_number()'), so a counter which goes up on every move never
+renders text after its first ten digits.
+Call 'clear()' when pygame is shut down - the fonts can't be used after 'pygame.quit()'.
+"""
+
+import pygame
+
+_fonts = {} # (file name, size) -> Font
+_surfaces = {} # (font, text, color) -> Surface
+
+def get_font(size, name=None):
+    """
+    Returns the font 'name' (None is pygame's default font) of the given size. Loads it the first time.
+    """
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(name, size)
+    return font
+
+def render(font, text, color):
+    """
+    Returns the antialiased surface of 'text'. Renders it the first time. The surface is shared - don't draw on it.
+    """
+    key = (font, text, color)
+    surface = _surfaces.get(key)
+    if surface is None:
+        surface = _surfaces[key] = font.render(text, True, color)
+    return surface
+
+def number_rect(font, n, color, center):
+    """
+    Returns the rectangle 'draw_number()' draws the number 'n' in.
+    """
+    return _glyphs_rect([render(font, digit, color) for digit in str(n)], center)
+
+def _glyphs_rect(glyphs, center):
+    rect = pygame.Rect(0, 0, sum(g.get_width() for g in glyphs), max(g.get_height() for g in glyphs))
+    rect.center = center
+    return rect
+
+def draw_number(screen, font, n, color, center):
+    """
+    Draws the number 'n' centered at 'center' by blitting the glyph of every digit. Returns the rectangle it was drawn in.
+    """
+    glyphs = [render(font, digit, color) for digit in str(n)]
+    rect = _glyphs_rect(glyphs, center)
+    x = rect.x
+    for glyph in glyphs:
+        screen.blit(glyph, (x, rect.y))
+        x += glyph.get_width()
+    return rect
+
+def clear():
+    """
+    Forgets all fonts and rendered text.
+    """
+    _fonts.clear()
+    _surfaces.clear()
@@ -0,0 +1,12 @@
+class Tile:
+    """
+    A puzzle piece - the number of the tile, its image (a part of the puzzle image) and the rectangle it is drawn at.
+    The hole is the tile with number 0; it is drawn only when the puzzle is solved.
+    """
+
+    __slots__ = ('number', 'image', 'rect')
+
+    def __init__(self, number, image, rect):
+        self.number = number
+        self.image = image
+        self.rect = rect
@@ -0,0 +1,127 @@
+"""
+Cache of the scaled puzzle image (the tile atlas the puzzle pieces are cut from), so the game doesn't decode and scale the
+image on every start.
+
+The atlas depends only on the bytes of the image and its side length on the screen, so it is saved under a name made of the
+SHA-256 of the image file and the side length. A changed image or screen size gets a new name and is built again; atlases
+of several images can be built in advance with this script.
+
+    offset  size    content
+    0       4       magic bytes b'8PZA'
+    4       2       format version (little-endian), currently 1
+    6       2       side length of the atlas in pixels
+    8       1       bytes per pixel, 3 (RGB) or 4 (RGBA)
+    9       3       zeros
+    12      4       CRC-32 of the pixels (little-endian)
+    16      ...     the pixels, row by row
+"""
+
+import hashlib
+import os
+from pathlib import Path
+import struct
+import zlib
+
+import pygame
+
+MAGIC = b'8PZA'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHHB3xI')
+_FORMATS = { 3: 'RGB', 4: 'RGBA' }
+
+
+def atlas_file_name(image_bytes, side):
+    return f'atlas_{hashlib.sha256(image_bytes).hexdigest()[:32]}_{side}.bin'
+
+
+def build_atlas(image_file, side):
+    """
+    Loads the image and scales it to 'side' x 'side' pixels. Requires the image to be square.
+    """
+    img = pygame.image.load(image_file)
+    if img.get_width() != img.get_height():
+        raise ValueError('Puzzle image must be square.')
+    return pygame.transform.smoothscale(img, (side, side))
+
+
+def write_atlas(file_name, atlas):
+    """
+    Saves the atlas. The file is written under a temporary name first, so a game which starts at the same time never reads
+    half a file.
+    """
+    bytes_per_pixel = 4 if atlas.get_flags() & pygame.SRCALPHA else 3
+    pixels = pygame.image.tobytes(atlas, _FORMATS[bytes_per_pixel])
+    header = _HEADER.pack(MAGIC, VERSION, atlas.get_width(), bytes_per_pixel, zlib.crc32(pixels))
+
+    temporary = Path(f'{file_name}.{os.getpid()}.tmp')
+    with open(temporary, 'wb') as f:
+        f.write(header)
+        f.write(pixels)
+    os.replace(temporary, file_name)
+
+
+def read_atlas(file_name):
+    """
+    Returns the atlas saved in the file. Raises an error if the file is not an atlas or is corrupted.
+    """
+    with open(file_name, 'rb') as f:
+        data = f.read()
+
+    if len(data) < _HEADER.size:
+        raise ValueError(f'{file_name} is too short to be a tile atlas.')
+    magic, version, side, bytes_per_pixel, checksum = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or bytes_per_pixel not in _FORMATS:
+        raise ValueError(f'{file_name} is not a tile atlas of version {VERSION}.')
+
+    pixels = memoryview(data)[_HEADER.size:]
+    if len(pixels) != side * side * bytes_per_pixel or zlib.crc32(pixels) != checksum:
+        raise ValueError(f'{file_name} is corrupted.')
+
+    return pygame.image.frombuffer(pixels, (side, side), _FORMATS[bytes_per_pixel])
+
+
+def load_atlas(image_file, side, cache_folder):
+    """
+    Returns the image scaled to 'side' x 'side' pixels. Reads it from 'cache_folder' if it is there, otherwise builds it and
+    saves it there. Returns the built atlas if it can't be saved.
+    """
+    with open(image_file, 'rb') as f:
+        image_bytes = f.read()
+    path = Path(cache_folder, atlas_file_name(image_bytes, side))
+
+    try:
+        return read_atlas(path)
+    except (OSError, ValueError):
+        pass # Not built yet, or a broken file which is replaced.
+
+    atlas = build_atlas(image_file, side)
+    try:
+        Path(cache_folder).mkdir(parents=True, exist_ok=True)
+        write_atlas(path, atlas)
+    except OSError:
+        pass # A read-only folder only costs the time to build the atlas on the next start.
+    return atlas
+
+
+if __name__ == '__main__':
+    """
+    Builds the atlases of puzzle images in advance, so the game finds them in the cache on its first start.
+    The default side length is the one of the game's screen.
+    Example:
+        python tile_atlas.py "../imgs/Shake-the-room.png" "../imgs/other.png"
+    """
+    import argparse
+
+    import game_constants as gc
+
+    parser = argparse.ArgumentParser(description='Build the tile atlases of puzzle images.')
+    parser.add_argument('images', nargs='+', help='square puzzle images')
+    parser.add_argument('--side', type=int, action='append', help='side length of the atlas in pixels, can be given more than once (default: the screen of the game)')
+    parser.add_argument('--folder', default=gc.TILE_ATLAS_CACHE_PATH, help='cache folder')
+    args = parser.parse_args()
+
+    for image in args.images:
+        for side in args.side or [gc.SCREEN_WIDTH - gc.BORDER_WIDTH * 2]:
+            load_atlas(image, side, args.folder)
+            print(f'{image}: {side} x {side}')
@@ -1,12 +1,19 @@
+import argparse
 from pathlib import Path
+import sys
 
+from curriculum import ReverseCurriculum
+from early_stopping import EarlyStopping
+from parallel_q_learning import ParallelQLearning, scaling_report
 from q_learning import QLearning
+from retrograde_bfs import RetrogradeBFS
+from training_metrics import TrainingMetrics
 
 if __name__ == '__main__':
     """
     Trains the q-agent.
     Finds a board arrangement which takes the most moves and prints it to the console.
-    Saves the resulting state-action map in "q_tables/table_1.pkl".
+    Saves the resulting state-action map in "q_tables/table_1.bin".
     
     With these training parameters:
         learning_rate=1.0,
@@ -14,25 +21,102 @@ if __name__ == '__main__':
         generations=2000000,
         max_steps=40,
         exploration_probability=1.0
-    it takes about 7 minutes to run.
+    it takes about 5 minutes to run.
+    With '--method batched' the same parameters are used to play 4096 games at once with NumPy, which takes under a minute.
+    With '--method bfs' the optimal state-action map is found with a breadth-first search in a few seconds. The number of
+    moves to solve every state is saved next to the map in "q_tables/distances_1.bin".
+    With '--method parallel' the games are split between '--workers' processes (by default one per core).
+    '--metrics FILE' writes the training metrics (speed, solved games, visited states, policy changes, ...) as JSON lines.
+    '--sweeps N' sweeps N states backward after every move (prioritized sweeping), which needs about 10 times fewer games.
+    '--curriculum' starts the games next to the solved state and moves them away as the agent learns (reverse curriculum);
+    with it '--generations 200000' is enough for an optimal map, in about 45 seconds.
+    '--stop-churn F', '--stop-patience N', '--stop-moves N' stop the training when it stops changing the map, checked every
+    '--stop-interval' games (see 'early_stopping.py'). E.g. '--stop-moves 31' stopped after 450000 generations.
+    '--scaling-report GENERATIONS' trains with 1, 2, 4, ... workers, prints how the training time scales and exits.
 
     Note that with the above training parameters 2000000 generations (games played) is probably overkill.
     I speculate that the optimal solution for every board arrangement can be found in 1000000 generations,
     and very close to optimal can be found in 500000 generations.
     """
 
-    agent = QLearning(
+    parser = argparse.ArgumentParser(description='Train the state-action map of the puzzle solver.')
+    parser.add_argument(
+        '--method',
+        choices=['q', 'batched', 'bfs', 'parallel'],
+        default='q',
+        help='q - one game at a time; batched - many games at once with NumPy; bfs - exact breadth-first search; parallel - games split between processes'
+    )
+    parser.add_argument('--workers', type=int, default=None, help='number of processes for --method parallel')
+    parser.add_argument('--metrics', metavar='FILE', help='write training metrics as JSON lines to this file (--method q only)')
+    parser.add_argument('--metrics-interval', type=int, default=10000, help='games between two metric reports (default 10000)')
+    parser.add_argument('--start-distance', type=int, help='start every game this many moves from the solved state (not for --method bfs)')
+    parser.add_argument('--sweeps', type=int, default=0, help='states to sweep backward after every move, see prioritized_sweeping.py (--method q only)')
+    parser.add_argument('--curriculum', action='store_true', help='start the games near the solved state and move away as the agent learns (--method q only)')
+    parser.add_argument('--generations', type=int, default=2000000, help='number of games to play (default 2000000)')
+    parser.add_argument('--stop-churn', type=float, metavar='FRACTION', help='stop when at most this fraction of the best actions changed since the last check (--method q only)')
+    parser.add_argument('--stop-patience', type=int, metavar='CHECKS', help='stop when a sampled evaluation did not improve in this many checks (--method q only)')
+    parser.add_argument('--stop-moves', type=int, metavar='MOVES', help='stop when every board is solved in at most this many moves (--method q only)')
+    parser.add_argument('--stop-interval', type=int, default=10000, help='games between two checks of the stopping criteria (default 10000)')
+    parser.add_argument('--scaling-report', type=int, metavar='GENERATIONS', help='report how parallel training scales with the number of workers')
+    args = parser.parse_args()
+
+    if args.method != 'q':
+        q_only = {
+            '--metrics': args.metrics is not None,
+            '--sweeps': args.sweeps != 0,
+            '--curriculum': args.curriculum,
+            '--stop-churn': args.stop_churn is not None,
+            '--stop-patience': args.stop_patience is not None,
+            '--stop-moves': args.stop_moves is not None
+        }
+        for flag, given in q_only.items():
+            if given:
+                parser.error(f'{flag} only works with --method q.')
+    if args.method == 'bfs' and args.start_distance is not None:
+        parser.error('--start-distance does not work with --method bfs.')
+    if args.curriculum and args.start_distance is not None:
+        parser.error('--curriculum chooses the start distances itself, so it cannot be used with --start-distance.')
+
+    if args.scaling_report is not None:
+        scaling_report(args.scaling_report, args.workers)
+        sys.exit()
+
+    parameters = dict(
         learning_rate=1.0,
         discount_factor=0.92,
-        generations=2000000,
+        generations=args.generations,
         max_steps=40,
-        exploration_probability=1.0
+        exploration_probability=1.0,
+        start_distance=args.start_distance
     )
 
-    agent.train()
+    if args.method == 'bfs':
+        agent = RetrogradeBFS()
+    elif args.method == 'parallel':
+        agent = ParallelQLearning(**parameters, workers=args.workers)
+    elif args.method == 'batched':
+        from batched_q_learning import BatchedQLearning # Requires NumPy.
+        agent = BatchedQLearning(**parameters)
+    else:
+        curriculum = ReverseCurriculum() if args.curriculum else None
+        agent = QLearning(**parameters, sweeps=args.sweeps, curriculum=curriculum)
+
+    if args.method == 'q':
+        metrics = None
+        if args.metrics is not None:
+            metrics = TrainingMetrics(interval=args.metrics_interval, file_name=args.metrics)
+        stopping = None
+        if (args.stop_churn, args.stop_patience, args.stop_moves) != (None, None, None):
+            stopping = EarlyStopping(args.stop_interval, args.stop_churn, args.stop_patience, args.stop_moves)
+        agent.train(metrics, stopping)
+        print(f'Played {agent.generations_used} generations, stopped early: {agent.stop_reason}.')
+    else:
+        agent.train()
     print(agent.test())
 
     folder_path = Path(__file__).parent.parent
-    file_path = Path(folder_path, 'q_tables\\table_1.pkl')
+    file_path = Path(folder_path, 'q_tables', 'table_1.bin')
 
-    agent.save(file_path)
\ No newline at end of file
+    agent.save(file_path)
+    if args.method == 'bfs':
+        agent.save_distances(Path(folder_path, 'q_tables', 'distances_1.bin'))
\ No newline at end of file
@@ -0,0 +1,112 @@
+import json
+import os
+import sys
+import time
+
+import permutation_rank as pr
+
+def _rss():
+    """
+    Returns the resident set size of the process in bytes, or None if it cannot be found on this platform.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    # No '/proc' - fall back to the peak RSS. It is in kilobytes on Linux and in bytes on macOS.
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class TrainingMetrics:
+    """
+    Collects statistics while 'QLearning.train()' runs and reports them every 'interval' games.
+
+    Every report is a dictionary:
+        generation - number of games played so far.
+        elapsed_seconds - time since the training started.
+        episodes_per_second, steps_per_second - speed of the training since the last report.
+        solved_fraction - fraction of the games since the last report which were solved in 'max_steps' moves.
+        mean_episode_length - average number of moves of the games since the last report.
+        states_visited - number of states which were visited at least once since the training started.
+        policy_changes - number of states whose best action changed since the last report.
+        rss_bytes - memory used by the process (None if it cannot be found on this platform).
+
+    The reports are appended as JSON lines to 'file_name' and/or passed to 'callback'.
+    Finding the policy changes goes through the whole Q-table, so very small intervals slow down the training.
+    """
+
+    def __init__(self, interval=10000, file_name=None, callback=None):
+        self.interval = interval
+        self.file_name = file_name
+        self.callback = callback
+        self.reports = [] # All reports so far.
+
+        self.visited = bytearray(pr.STATE_COUNT) # 1 for every state which was visited.
+        self._best_actions = None
+        self._reset_interval()
+
+    def _reset_interval(self):
+        self._start = time.perf_counter()
+        self._games = 0
+        self._steps = 0
+        self._solved = 0
+
+    def start(self, q_table, find_best_action):
+        """
+        Called once before the first game. 'find_best_action(q_table, state)' returns the best action in a state.
+        """
+        self._find_best_action = find_best_action
+        self._best_actions = self._get_best_actions(q_table)
+        self._training_start = time.perf_counter()
+        self._reset_interval()
+
+        if self.file_name is not None:
+            open(self.file_name, 'w').close() # Start a new file.
+
+    def game_finished(self, steps, solved):
+        self._games += 1
+        self._steps += steps
+        self._solved += solved
+
+    def _get_best_actions(self, q_table):
+        return [self._find_best_action(q_table, state)[0] for state in range(0, pr.STATE_COUNT)]
+
+    def report(self, generation, q_table):
+        """
+        Makes a report and sends it to the file and the callback.
+        """
+        now = time.perf_counter()
+        seconds = max(now - self._start, 1e-9)
+
+        best_actions = self._get_best_actions(q_table)
+        policy_changes = sum(1 for old, new in zip(self._best_actions, best_actions) if old != new)
+        self._best_actions = best_actions
+
+        report = {
+            'generation': generation,
+            'elapsed_seconds': now - self._training_start,
+            'episodes_per_second': self._games / seconds,
+            'steps_per_second': self._steps / seconds,
+            'solved_fraction': self._solved / self._games if self._games else 0.0,
+            'mean_episode_length': self._steps / self._games if self._games else 0.0,
+            'states_visited': self.visited.count(1),
+            'policy_changes': policy_changes,
+            'rss_bytes': _rss()
+        }
+        self.reports.append(report)
+
+        if self.file_name is not None:
+            with open(self.file_name, 'a') as f:
+                f.write(json.dumps(report) + '\n')
+        if self.callback is not None:
+            self.callback(report)
+
+        # Don't count the time spent on the report.
+        self._reset_interval()
+        return report